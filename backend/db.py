@@ -1,13 +1,44 @@
 import os
+import time
+import asyncio
 import asyncpg
 import ssl
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Tuple
 from supabase import create_client, Client
 import json
+from datetime import datetime, timezone
+from collections import defaultdict
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Supabase Postgres requires SSL; build the context once and share it across pool (re)creation
+SSL_CONTEXT = ssl.create_default_context()
+
+# Columns returned by direct SQL claim reads (geometry is only needed for the map)
+CLAIM_COLUMNS = "id, claimant_name, village, area, status, created_at, updated_at"
+
+# Placeholder plot used for claims that have no stored geometry
+DEFAULT_POLYGON_COORDS = ((0, 0), (0.001, 0), (0.001, 0.001), (0, 0.001), (0, 0))
+DEFAULT_POLYGON_WKT = "POLYGON((" + ", ".join(f"{x} {y}" for x, y in DEFAULT_POLYGON_COORDS) + "))"
+
+# Demo plots at real forest locations, in demo claim order
+DEMO_PLOT_COORDS = (
+    # Kanha National Park, MP
+    ((80.2707, 20.0937), (80.2807, 20.0937), (80.2807, 20.1037), (80.2707, 20.1037), (80.2707, 20.0937)),
+    # Pench National Park, MP
+    ((81.0379, 19.9373), (81.0479, 19.9373), (81.0479, 19.9473), (81.0379, 19.9473), (81.0379, 19.9373)),
+    # Bandhavgarh National Park, MP
+    ((80.5770, 23.8315), (80.5870, 23.8315), (80.5870, 23.8415), (80.5770, 23.8415), (80.5770, 23.8315)),
+    # Papikonda National Park, AP
+    ((83.3932, 17.3753), (83.4032, 17.3753), (83.4032, 17.3853), (83.3932, 17.3853), (83.3932, 17.3753)),
+    # Bandipur National Park, Karnataka
+    ((76.4951, 12.1568), (76.5051, 12.1568), (76.5051, 12.1668), (76.4951, 12.1668), (76.4951, 12.1568)),
+    # Jamunia village, Mandla, MP
+    ((80.1500, 22.7500), (80.1600, 22.7500), (80.1600, 22.7600), (80.1500, 22.7600), (80.1500, 22.7500)),
+)
+
 class Database:
     def __init__(self):
         self.supabase_url = os.getenv("SUPABASE_URL")
@@ -32,15 +63,43 @@ class Database:
             print("   Using mock data for demonstration purposes")
             print("   Set SUPABASE_URL and SUPABASE_KEY for production use")
             self.supabase = None
-            self._demo_claims = self._get_demo_claims()  # Store demo claims in memory
-            self._demo_schemes = self._get_demo_schemes()
-            self._demo_recommendations = []
+            self._init_demo_store(self._get_demo_claims())  # Store demo data in memory
         
         self._pool: Optional[asyncpg.Pool] = None
+        
+        # Pool sizing stays well inside Supabase's connection budget.
+        # Set DB_STATEMENT_CACHE_SIZE=0 when DATABASE_URL points at the
+        # Supavisor transaction pooler, which cannot keep prepared statements.
+        self._pool_min_size = int(os.getenv("POOL_MIN_SIZE", 5))
+        self._pool_max_size = int(os.getenv("POOL_MAX_SIZE", 20))
+        self._statement_cache_size = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 1024))
+        
+        # Schemes change rarely, so cache them in-process for a short TTL
+        self._schemes_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        self._schemes_ttl = 60.0
+        self._schemes_lock: Optional[asyncio.Lock] = None
+        
+        # Briefly cache the claims-table fingerprint used for /map ETags
+        self._map_version_cache: Optional[Tuple[float, str]] = None
+        self._map_version_ttl = 1.0
+        # Serialized /map payload together with the fingerprint it was built for
+        self._map_payload_cache: Optional[Tuple[str, bytes]] = None
+    
+    def _init_demo_store(self, claims: List[Dict[str, Any]]):
+        """Set up the in-memory demo tables, keyed by ID with monotonic ID counters"""
+        self._demo_claims: Dict[int, Dict[str, Any]] = {claim["id"]: claim for claim in claims}
+        self._next_claim_id = max(self._demo_claims, default=0) + 1
+        self._demo_map_cache = None
+        self._demo_schemes: Dict[int, Dict[str, Any]] = {
+            scheme["id"]: scheme for scheme in self._get_demo_schemes()
+        }
+        self._next_scheme_id = max(self._demo_schemes, default=0) + 1
+        self._demo_recommendations: Dict[int, Dict[str, Any]] = {}
+        self._demo_recs_by_claim: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        self._next_recommendation_id = 1
     
     def _get_demo_claims(self) -> List[Dict[str, Any]]:
         """Get demo claims for demo mode"""
-        from datetime import datetime
         return [
             {
                 "id": 1,
@@ -49,8 +108,8 @@ class Database:
                 "district": "Mandla, Madhya Pradesh",
                 "area": 3.2,
                 "status": "granted",
-                "created_at": datetime.now(),
-                "updated_at": datetime.now()
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
             },
             {
                 "id": 2,
@@ -59,8 +118,8 @@ class Database:
                 "district": "Seoni, Madhya Pradesh",
                 "area": 2.8,
                 "status": "pending",
-                "created_at": datetime.now(),
-                "updated_at": datetime.now()
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
             },
             {
                 "id": 3,
@@ -69,8 +128,8 @@ class Database:
                 "district": "Umaria, Madhya Pradesh",
                 "area": 1.5,
                 "status": "rejected",
-                "created_at": datetime.now(),
-                "updated_at": datetime.now()
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
             },
             {
                 "id": 4,
@@ -79,8 +138,8 @@ class Database:
                 "district": "East Godavari, Andhra Pradesh",
                 "area": 4.1,
                 "status": "granted",
-                "created_at": datetime.now(),
-                "updated_at": datetime.now()
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
             },
             {
                 "id": 5,
@@ -89,8 +148,8 @@ class Database:
                 "district": "Chamarajanagar, Karnataka",
                 "area": 2.3,
                 "status": "pending",
-                "created_at": datetime.now(),
-                "updated_at": datetime.now()
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
             },
             {
                 "id": 6,
@@ -99,35 +158,34 @@ class Database:
                 "district": "मंडला, मध्य प्रदेश",
                 "area": 3.5,
                 "status": "granted",
-                "created_at": datetime.now(),
-                "updated_at": datetime.now()
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
             }
         ]
     
     def _get_demo_schemes(self) -> List[Dict[str, Any]]:
         """Get demo schemes for demo mode"""
-        from datetime import datetime
         return [
             {
                 "id": 1,
                 "scheme_name": "Irrigation Support Scheme",
                 "description": "Support for irrigation infrastructure for larger land holdings",
                 "eligibility_rules": {"min_area": 2.0, "max_area": None, "allowed_statuses": ["granted", "pending"]},
-                "created_at": datetime.now()
+                "created_at": datetime.now(timezone.utc)
             },
             {
                 "id": 2,
                 "scheme_name": "Legal Aid Scheme",
                 "description": "Legal assistance for pending forest rights claims",
                 "eligibility_rules": {"min_area": 0.1, "max_area": None, "allowed_statuses": ["pending"]},
-                "created_at": datetime.now()
+                "created_at": datetime.now(timezone.utc)
             },
             {
                 "id": 3,
                 "scheme_name": "Community Forest Rights Scheme",
                 "description": "Support for small community forest rights holders",
                 "eligibility_rules": {"min_area": 0.1, "max_area": 3.0, "allowed_statuses": ["granted"]},
-                "created_at": datetime.now()
+                "created_at": datetime.now(timezone.utc)
             }
         ]
     
@@ -135,15 +193,34 @@ class Database:
         """Initialize database connection pool"""
         if self.database_url and self._pool is None and not self.demo_mode:
             try:
-                # Supabase Postgres requires SSL; use a default SSL context
-                self._pool = await asyncpg.create_pool(self.database_url, ssl=True, min_size=1, max_size=5)
+                # Supabase Postgres requires SSL; reuse the shared SSL context
+                self._pool = await asyncpg.create_pool(
+                    self.database_url,
+                    ssl=SSL_CONTEXT,
+                    min_size=self._pool_min_size,
+                    max_size=self._pool_max_size,
+                    max_inactive_connection_lifetime=300,
+                    statement_cache_size=self._statement_cache_size,
+                    server_settings={
+                        "application_name": "fra-atlas",
+                        "jit": "off",
+                        "tcp_keepalives_idle": "60"
+                    },
+                    init=self._init_connection
+                )
             except Exception as e:
                 print(f"⚠️  Database connection failed, switching to DEMO MODE: {str(e)}")
                 self.demo_mode = True
                 self.supabase = None
-                self._demo_claims = []
-                self._demo_schemes = self._get_demo_schemes()
-                self._demo_recommendations = []
+                self._init_demo_store([])
+    
+    @staticmethod
+    async def _init_connection(connection):
+        """Decode json/jsonb columns into Python objects like PostgREST does"""
+        for type_name in ("json", "jsonb"):
+            await connection.set_type_codec(
+                type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+            )
     
     async def close_pool(self):
         """Close database connection pool"""
@@ -151,41 +228,64 @@ class Database:
             await self._pool.close()
             self._pool = None
     
-    async def get_connection(self):
-        """Get database connection from pool"""
-        if not self._pool:
-            await self.init_pool()
-        return await self._pool.acquire()
+    async def _execute(self, query):
+        """Run a Supabase query in a worker thread; the client does blocking HTTP"""
+        return await asyncio.to_thread(query.execute)
     
-    async def release_connection(self, connection):
-        """Release database connection back to pool"""
-        if self._pool:
-            await self._pool.release(connection)
+    async def ping(self) -> bool:
+        """Cheap liveness check against the database"""
+        if self.demo_mode:
+            return True
+        elif self._pool:
+            async with self._pool.acquire() as connection:
+                await connection.fetchval("SELECT 1")
+            return True
+        else:
+            await self._execute(self.supabase.table('claims').select('id').limit(1))
+            return True
     
     # Claims operations
     async def create_claim(self, claim_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new claim with dummy polygon"""
         if self.demo_mode:
             # Demo mode: store in memory
-            from datetime import datetime
-            claim_id = len(self._demo_claims) + 1
+            claim_id = self._next_claim_id
+            self._next_claim_id += 1
             new_claim = {
                 "id": claim_id,
                 **claim_data,
-                "created_at": datetime.now(),
-                "updated_at": datetime.now()
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
             }
-            self._demo_claims.append(new_claim)
+            self._demo_claims[claim_id] = new_claim
+            self._demo_map_cache = None
             return new_claim
+        elif self._pool:
+            # Production mode: parameterized insert straight into Postgres,
+            # with the default geometry built server-side
+            try:
+                async with self._pool.acquire() as connection:
+                    row = await connection.fetchrow(
+                        "INSERT INTO claims (claimant_name, village, area, status, geom) "
+                        "VALUES ($1, $2, $3, $4, ST_GeomFromText($5, 4326)) "
+                        f"RETURNING {CLAIM_COLUMNS}",
+                        claim_data["claimant_name"], claim_data["village"],
+                        claim_data["area"], claim_data["status"], DEFAULT_POLYGON_WKT
+                    )
+                self._map_version_cache = None
+                return dict(row) if row else None
+            except Exception as e:
+                raise Exception(f"Failed to create claim: {str(e)}")
         else:
             # Production mode: use Supabase with default geometry
             try:
                 # Add default geometry (small polygon around origin)
                 claim_data_with_geom = {
                     **claim_data,
-                    "geom": "POLYGON((0 0, 0.001 0, 0.001 0.001, 0 0.001, 0 0))"
+                    "geom": DEFAULT_POLYGON_WKT
                 }
-                result = self.supabase.table('claims').insert(claim_data_with_geom).execute()
+                result = await self._execute(self.supabase.table('claims').insert(claim_data_with_geom))
+                self._map_version_cache = None
                 return result.data[0] if result.data else None
             except Exception as e:
                 raise Exception(f"Failed to create claim: {str(e)}")
@@ -194,10 +294,23 @@ class Database:
         """Get all claims, optionally filtered by status"""
         if self.demo_mode:
             # Demo mode: filter from memory
-            claims = self._demo_claims
+            claims = list(self._demo_claims.values())
             if status:
                 claims = [c for c in claims if c.get('status') == status]
             return claims
+        elif self._pool:
+            # Production mode: read directly from Postgres
+            try:
+                async with self._pool.acquire() as connection:
+                    if status:
+                        rows = await connection.fetch(
+                            f"SELECT {CLAIM_COLUMNS} FROM claims WHERE status = $1", status
+                        )
+                    else:
+                        rows = await connection.fetch(f"SELECT {CLAIM_COLUMNS} FROM claims")
+                return [dict(row) for row in rows]
+            except Exception as e:
+                raise Exception(f"Failed to get claims: {str(e)}")
         else:
             # Production mode: use Supabase
             try:
@@ -205,7 +318,7 @@ class Database:
                 if status:
                     query = query.eq('status', status)
                 
-                result = query.execute()
+                result = await self._execute(query)
                 return result.data or []
             except Exception as e:
                 raise Exception(f"Failed to get claims: {str(e)}")
@@ -214,113 +327,83 @@ class Database:
         """Get a specific claim by ID"""
         if self.demo_mode:
             # Demo mode: find in memory
-            for claim in self._demo_claims:
-                if claim['id'] == claim_id:
-                    return claim
-            return None
+            return self._demo_claims.get(claim_id)
+        elif self._pool:
+            # Production mode: read directly from Postgres
+            try:
+                async with self._pool.acquire() as connection:
+                    row = await connection.fetchrow(
+                        f"SELECT {CLAIM_COLUMNS} FROM claims WHERE id = $1", claim_id
+                    )
+                return dict(row) if row else None
+            except Exception as e:
+                raise Exception(f"Failed to get claim: {str(e)}")
         else:
             # Production mode: use Supabase
             try:
-                result = self.supabase.table('claims').select('*').eq('id', claim_id).execute()
+                result = await self._execute(self.supabase.table('claims').select('*').eq('id', claim_id))
                 return result.data[0] if result.data else None
             except Exception as e:
                 raise Exception(f"Failed to get claim: {str(e)}")
     
+    async def get_claims_by_ids(self, claim_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get several claims by ID in a single query"""
+        if not claim_ids:
+            return []
+        if self.demo_mode:
+            return [self._demo_claims[claim_id] for claim_id in set(claim_ids)
+                    if claim_id in self._demo_claims]
+        elif self._pool:
+            try:
+                async with self._pool.acquire() as connection:
+                    rows = await connection.fetch(
+                        f"SELECT {CLAIM_COLUMNS} FROM claims WHERE id = ANY($1::int[])", claim_ids
+                    )
+                return [dict(row) for row in rows]
+            except Exception as e:
+                raise Exception(f"Failed to get claims: {str(e)}")
+        else:
+            try:
+                result = await self._execute(self.supabase.table('claims').select('*').in_('id', claim_ids))
+                return result.data or []
+            except Exception as e:
+                raise Exception(f"Failed to get claims: {str(e)}")
+    
     async def get_map_data(self) -> Dict[str, Any]:
         """Get all claims as GeoJSON for map display"""
         if self.demo_mode:
-            # Demo mode: create GeoJSON from demo claims with realistic forest coordinates
-            features = []
-            # Real forest locations with actual coordinates
-            demo_coords = [
-                [80.2707, 20.0937],  # Kanha National Park, MP
-                [81.0379, 19.9373],  # Pench National Park, MP
-                [80.5770, 23.8315],  # Bandhavgarh National Park, MP
-                [83.3932, 17.3753],  # Papikonda National Park, AP
-                [76.4951, 12.1568],  # Bandipur National Park, Karnataka
-                [80.1500, 22.7500],  # Jamunia village area, Mandla, MP
-            ]
-            
-            for i, claim in enumerate(self._demo_claims):
-                # Use specific coordinates for each claim
-                base_lng, base_lat = demo_coords[i % len(demo_coords)]
-                offset = i * 0.02  # Smaller offset for realistic clustering
-                
-                # Create realistic forest plot polygons for each location
-                if i == 0:  # Kanha National Park area
-                    coords = [
-                        [80.2707, 20.0937],
-                        [80.2807, 20.0937],
-                        [80.2807, 20.1037],
-                        [80.2707, 20.1037],
-                        [80.2707, 20.0937]
-                    ]
-                elif i == 1:  # Pench National Park area
-                    coords = [
-                        [81.0379, 19.9373],
-                        [81.0479, 19.9373],
-                        [81.0479, 19.9473],
-                        [81.0379, 19.9473],
-                        [81.0379, 19.9373]
-                    ]
-                elif i == 2:  # Bandhavgarh National Park area
-                    coords = [
-                        [80.5770, 23.8315],
-                        [80.5870, 23.8315],
-                        [80.5870, 23.8415],
-                        [80.5770, 23.8415],
-                        [80.5770, 23.8315]
-                    ]
-                elif i == 3:  # Papikonda National Park area
-                    coords = [
-                        [83.3932, 17.3753],
-                        [83.4032, 17.3753],
-                        [83.4032, 17.3853],
-                        [83.3932, 17.3853],
-                        [83.3932, 17.3753]
-                    ]
-                elif i == 4:  # Bandipur National Park area
-                    coords = [
-                        [76.4951, 12.1568],
-                        [76.5051, 12.1568],
-                        [76.5051, 12.1668],
-                        [76.4951, 12.1668],
-                        [76.4951, 12.1568]
-                    ]
-                else:  # Jamunia village, Mandla, MP
-                    coords = [
-                        [80.1500, 22.7500],
-                        [80.1600, 22.7500],
-                        [80.1600, 22.7600],
-                        [80.1500, 22.7600],
-                        [80.1500, 22.7500]
-                    ]
-                
-                feature = {
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Polygon",
-                        "coordinates": [coords]
-                    },
-                    "properties": {
-                        "id": str(claim["id"]),
-                        "claimant_name": claim["claimant_name"],
-                        "village": claim["village"],
-                        "district": claim.get("district", "Demo District"),
-                        "area_hectares": claim["area"],
-                        "status": "granted" if claim["status"] == "granted" else "pending" if claim["status"] == "pending" else "rejected"
+            # Demo mode: build GeoJSON from demo claims once and reuse it until a claim is added
+            if self._demo_map_cache is None:
+                features = []
+                for i, claim in enumerate(self._demo_claims.values()):
+                    # Claims beyond the known plots share the last location
+                    coords = DEMO_PLOT_COORDS[min(i, len(DEMO_PLOT_COORDS) - 1)]
+                    feature = {
+                        "type": "Feature",
+                        "geometry": {
+                            "type": "Polygon",
+                            "coordinates": [coords]
+                        },
+                        "properties": {
+                            "id": str(claim["id"]),
+                            "claimant_name": claim["claimant_name"],
+                            "village": claim["village"],
+                            "district": claim.get("district", "Demo District"),
+                            "area_hectares": claim["area"],
+                            "status": "granted" if claim["status"] == "granted" else "pending" if claim["status"] == "pending" else "rejected"
+                        }
                     }
+                    features.append(feature)
+                
+                self._demo_map_cache = {
+                    "type": "FeatureCollection",
+                    "features": features
                 }
-                features.append(feature)
-            
-            return {
-                "type": "FeatureCollection",
-                "features": features
-            }
+            return self._demo_map_cache
         else:
             # Production mode: use Supabase
             try:
-                result = self.supabase.table('claims').select('*').execute()
+                result = await self._execute(self.supabase.table('claims').select('*'))
                 claims = result.data or []
                 
                 features = []
@@ -330,7 +413,7 @@ class Database:
                         "type": "Feature",
                         "geometry": {
                             "type": "Polygon",
-                            "coordinates": [[[0, 0], [0.001, 0], [0.001, 0.001], [0, 0.001], [0, 0]]]
+                            "coordinates": [DEFAULT_POLYGON_COORDS]
                         },
                         "properties": {
                             "id": str(claim["id"]),
@@ -350,33 +433,137 @@ class Database:
             except Exception as e:
                 raise Exception(f"Failed to get map data: {str(e)}")
     
+    async def get_map_version(self) -> str:
+        """Get a cheap fingerprint of the claims table for map cache validation"""
+        if self.demo_mode:
+            # Demo claims are only ever added, so the ID counter identifies the data
+            return f"demo:{self._next_claim_id}"
+        
+        now = time.monotonic()
+        if self._map_version_cache and now - self._map_version_cache[0] < self._map_version_ttl:
+            return self._map_version_cache[1]
+        
+        try:
+            if self._pool:
+                async with self._pool.acquire() as connection:
+                    row = await connection.fetchrow(
+                        "SELECT EXTRACT(EPOCH FROM max(updated_at)) AS ts, count(*) AS n FROM claims"
+                    )
+                version = f"{row['ts']}:{row['n']}"
+            else:
+                # Descending order puts NULLs first; keep them last, as max() ignores them
+                result = await self._execute(self.supabase.table('claims')
+                                             .select('updated_at', count='exact')
+                                             .order('updated_at', desc=True, nullsfirst=False)
+                                             .limit(1))
+                latest = result.data[0]['updated_at'] if result.data else None
+                version = f"{latest}:{result.count}"
+        except Exception as e:
+            raise Exception(f"Failed to get map version: {str(e)}")
+        
+        self._map_version_cache = (now, version)
+        return version
+    
+    async def get_map_geojson(self) -> bytes:
+        """Get all claims as a serialized GeoJSON FeatureCollection, rebuilt
+        only when the claims fingerprint changes"""
+        version = await self.get_map_version()
+        if self._map_payload_cache and self._map_payload_cache[0] == version:
+            return self._map_payload_cache[1]
+        
+        payload = await self._build_map_geojson()
+        self._map_payload_cache = (version, payload)
+        return payload
+    
+    async def _build_map_geojson(self) -> bytes:
+        """Serialize all claims as a GeoJSON FeatureCollection"""
+        if not self.demo_mode and self._pool:
+            # Build the whole FeatureCollection in Postgres and return it as text,
+            # so it can be sent to the client without a Python decode/encode pass
+            # (encoded once here, since the payload is cached)
+            query = """
+                SELECT jsonb_build_object(
+                    'type', 'FeatureCollection',
+                    'features', COALESCE(jsonb_agg(jsonb_build_object(
+                        'type', 'Feature',
+                        'geometry', COALESCE(
+                            ST_AsGeoJSON(c.geom)::jsonb,
+                            '{"type": "Polygon", "coordinates": [[[0, 0], [0.001, 0], [0.001, 0.001], [0, 0.001], [0, 0]]]}'::jsonb
+                        ),
+                        'properties', jsonb_build_object(
+                            'id', c.id::text,
+                            'claimant_name', c.claimant_name,
+                            'village', c.village,
+                            -- Claims are stored without a district
+                            'district', 'Unknown',
+                            'area_hectares', c.area,
+                            'status', c.status
+                        )
+                    )), '[]'::jsonb)
+                )::text
+                FROM claims c
+            """
+            try:
+                async with self._pool.acquire() as connection:
+                    return (await connection.fetchval(query)).encode()
+            except Exception as e:
+                raise Exception(f"Failed to get map data: {str(e)}")
+        
+        return orjson.dumps(await self.get_map_data())
+    
     # Schemes operations
     async def get_schemes(self) -> List[Dict[str, Any]]:
         """Get all schemes"""
         if self.demo_mode:
-            return self._demo_schemes
+            return list(self._demo_schemes.values())
         else:
-            try:
-                result = self.supabase.table('schemes').select('*').execute()
-                return result.data or []
-            except Exception as e:
-                raise Exception(f"Failed to get schemes: {str(e)}")
+            if self._schemes_cache_fresh():
+                return self._schemes_cache[1]
+            
+            # Lock is created lazily so it binds to the running event loop
+            if self._schemes_lock is None:
+                self._schemes_lock = asyncio.Lock()
+            
+            async with self._schemes_lock:
+                # Another request may have refreshed the cache while we waited
+                if self._schemes_cache_fresh():
+                    return self._schemes_cache[1]
+                try:
+                    if self._pool:
+                        async with self._pool.acquire() as connection:
+                            rows = await connection.fetch(
+                                "SELECT id, scheme_name, description, eligibility_rules, created_at FROM schemes"
+                            )
+                        schemes = [dict(row) for row in rows]
+                    else:
+                        result = await self._execute(self.supabase.table('schemes').select('*'))
+                        schemes = result.data or []
+                except Exception as e:
+                    raise Exception(f"Failed to get schemes: {str(e)}")
+                self._schemes_cache = (time.monotonic(), schemes)
+                return schemes
+    
+    def _schemes_cache_fresh(self) -> bool:
+        """Check whether the cached schemes are still within their TTL"""
+        return (self._schemes_cache is not None
+                and time.monotonic() - self._schemes_cache[0] < self._schemes_ttl)
     
     async def create_scheme(self, scheme_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new scheme"""
         if self.demo_mode:
-            from datetime import datetime
-            scheme_id = len(self._demo_schemes) + 1
+            scheme_id = self._next_scheme_id
+            self._next_scheme_id += 1
             new_scheme = {
                 "id": scheme_id,
                 **scheme_data,
-                "created_at": datetime.now()
+                "created_at": datetime.now(timezone.utc)
             }
-            self._demo_schemes.append(new_scheme)
+            self._demo_schemes[scheme_id] = new_scheme
             return new_scheme
         else:
             try:
-                result = self.supabase.table('schemes').insert(scheme_data).execute()
+                result = await self._execute(self.supabase.table('schemes').insert(scheme_data))
+                self._schemes_cache = None
                 return result.data[0] if result.data else None
             except Exception as e:
                 raise Exception(f"Failed to create scheme: {str(e)}")
@@ -385,51 +572,149 @@ class Database:
     async def create_recommendation(self, recommendation_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new recommendation"""
         if self.demo_mode:
-            from datetime import datetime
-            rec_id = len(self._demo_recommendations) + 1
+            rec_id = self._next_recommendation_id
+            self._next_recommendation_id += 1
             new_rec = {
                 "id": rec_id,
                 **recommendation_data,
-                "created_at": datetime.now()
+                "created_at": datetime.now(timezone.utc)
             }
-            self._demo_recommendations.append(new_rec)
+            self._demo_recommendations[rec_id] = new_rec
+            self._demo_recs_by_claim[new_rec.get('claim_id')].append(new_rec)
             return new_rec
         else:
             try:
-                result = self.supabase.table('recommendations').insert(recommendation_data).execute()
+                result = await self._execute(self.supabase.table('recommendations').insert(recommendation_data))
                 return result.data[0] if result.data else None
             except Exception as e:
                 raise Exception(f"Failed to create recommendation: {str(e)}")
     
+    async def create_recommendations_bulk(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several recommendations in a single insert"""
+        if not rows:
+            return []
+        if self.demo_mode:
+            created = []
+            for row in rows:
+                rec_id = self._next_recommendation_id
+                self._next_recommendation_id += 1
+                new_rec = {
+                    "id": rec_id,
+                    **row,
+                    "created_at": datetime.now(timezone.utc)
+                }
+                self._demo_recommendations[rec_id] = new_rec
+                self._demo_recs_by_claim[new_rec.get('claim_id')].append(new_rec)
+                created.append(new_rec)
+            return created
+        elif self._pool:
+            # One INSERT ... RETURNING gives back ids and timestamps without a follow-up SELECT
+            try:
+                async with self._pool.acquire() as connection:
+                    records = await connection.fetch(
+                        """
+                        INSERT INTO recommendations (claim_id, scheme_id, score)
+                        SELECT * FROM UNNEST($1::int[], $2::int[], $3::float8[])
+                        RETURNING id, claim_id, scheme_id, score, created_at
+                        """,
+                        [row["claim_id"] for row in rows],
+                        [row["scheme_id"] for row in rows],
+                        [row["score"] for row in rows]
+                    )
+                return [dict(record) for record in records]
+            except Exception as e:
+                raise Exception(f"Failed to create recommendations: {str(e)}")
+        else:
+            try:
+                # PostgREST returns the inserted rows (representation) by default
+                result = await self._execute(self.supabase.table('recommendations').insert(rows))
+                return result.data or []
+            except Exception as e:
+                raise Exception(f"Failed to create recommendations: {str(e)}")
+    
     async def get_recommendations_for_claim(self, claim_id: int) -> List[Dict[str, Any]]:
         """Get recommendations for a specific claim"""
         if self.demo_mode:
-            # Demo mode: filter recommendations and add scheme info
-            recommendations = []
-            for rec in self._demo_recommendations:
-                if rec.get('claim_id') == claim_id:
-                    # Find scheme info
-                    scheme_info = None
-                    for scheme in self._demo_schemes:
-                        if scheme['id'] == rec.get('scheme_id'):
-                            scheme_info = scheme
-                            break
-                    
-                    rec_with_scheme = {
-                        **rec,
-                        "schemes": scheme_info
-                    }
-                    recommendations.append(rec_with_scheme)
-            return recommendations
+            # Demo mode: look up the claim's recommendations and attach scheme info by id
+            return [
+                {**rec, "schemes": self._demo_schemes.get(rec.get('scheme_id'))}
+                for rec in self._demo_recs_by_claim.get(claim_id, [])
+            ]
+        elif self._pool:
+            # Production mode: join the scheme in SQL, shaped like PostgREST's schemes(*) embed
+            try:
+                async with self._pool.acquire() as connection:
+                    rows = await connection.fetch(
+                        """
+                        SELECT r.id, r.claim_id, r.scheme_id, r.score, r.created_at,
+                               to_jsonb(s) AS schemes
+                        FROM recommendations r
+                        LEFT JOIN schemes s ON s.id = r.scheme_id
+                        WHERE r.claim_id = $1
+                        """,
+                        claim_id
+                    )
+                return [dict(row) for row in rows]
+            except Exception as e:
+                raise Exception(f"Failed to get recommendations: {str(e)}")
         else:
             try:
-                result = (self.supabase.table('recommendations')
-                         .select('*, schemes(*)')
-                         .eq('claim_id', claim_id)
-                         .execute())
+                result = await self._execute(self.supabase.table('recommendations')
+                                             .select('*, schemes(*)')
+                                             .eq('claim_id', claim_id))
                 return result.data or []
             except Exception as e:
                 raise Exception(f"Failed to get recommendations: {str(e)}")
 
+class ClaimLoader:
+    """Coalesce concurrent get-claim-by-id lookups into one batched query"""
+    
+    def __init__(self, database: Database, batch_window: float = 0.002):
+        self._db = database
+        self._batch_window = batch_window
+        self._pending: Dict[int, List[asyncio.Future]] = {}
+        # Flush collecting the current batch window, if one is open
+        self._flush_task: Optional[asyncio.Task] = None
+        # The event loop only keeps weak references to tasks, so every flush
+        # is held here until it has resolved its futures
+        self._flush_tasks: Set[asyncio.Task] = set()
+    
+    async def load(self, claim_id: int) -> Optional[Dict[str, Any]]:
+        """Load a claim, sharing the round-trip with other lookups in the same window"""
+        if self._db.demo_mode:
+            # In-memory lookups gain nothing from batching
+            return await self._db.get_claim_by_id(claim_id)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(claim_id, []).append(future)
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush())
+            self._flush_tasks.add(self._flush_task)
+            self._flush_task.add_done_callback(self._flush_tasks.discard)
+        return await future
+    
+    async def _flush(self):
+        """Fire one query for every claim ID collected during the batch window"""
+        await asyncio.sleep(self._batch_window)
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+        
+        try:
+            claims = await self._db.get_claims_by_ids(list(pending))
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        
+        claims_by_id = {claim['id']: claim for claim in claims}
+        for claim_id, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(claims_by_id.get(claim_id))
+
 # Global database instance
-db = Database()
\ No newline at end of file
+db = Database()
+claim_loader = ClaimLoader(db)
\ No newline at end of file
@@ -1,6 +1,6 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 import logging
@@ -15,6 +15,7 @@ from routes.recommendations import router as recommendations_router
 
 # Import database
 from db import db
+from utils.rules import recommendation_engine
 
 # Configure logging
 logging.basicConfig(
@@ -28,11 +29,20 @@ async def lifespan(app: FastAPI):
     """Application lifespan management"""
     # Startup
     logger.info("Starting up FastAPI application")
+    if cors_wildcard:
+        logger.warning("CORS configured with wildcard origins; using allow_origin_regex for compatibility with credentials")
+    else:
+        logger.info("CORS allowing origins: %s", ', '.join(sorted(allowed_origins)))
     try:
         await db.init_pool()
         logger.info("Database connection pool initialized")
     except Exception as e:
-        logger.error(f"Failed to initialize database pool: {str(e)}")
+        logger.error("Failed to initialize database pool: %s", e)
+    try:
+        recommendation_engine.warm_up()
+        logger.info("Recommendation engine warmed up")
+    except Exception as e:
+        logger.error("Failed to warm up recommendation engine: %s", e)
 
     yield
 
@@ -42,7 +52,7 @@ async def lifespan(app: FastAPI):
         await db.close_pool()
         logger.info("Database connection pool closed")
     except Exception as e:
-        logger.error(f"Error closing database pool: {str(e)}")
+        logger.error("Error closing database pool: %s", e)
 
 
 # Create FastAPI app
@@ -53,21 +63,21 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan)
 
-# Configure CORS for frontend integration
+# Configure CORS for frontend integration (resolved once at import)
 if os.getenv("NODE_ENV") == "production":
     # Production: Use only production origins
     production_origins = os.getenv("PRODUCTION_ORIGINS", "")
-    allowed_origins = [origin.strip() for origin in production_origins.split(",") if origin.strip()]
+    allowed_origins = frozenset(origin.strip() for origin in production_origins.split(",") if origin.strip())
     if not allowed_origins:
         # Fallback if no production origins set
-        allowed_origins = ["https://your-frontend.netlify.app", "https://your-frontend.vercel.app"]
+        allowed_origins = frozenset({"https://your-frontend.netlify.app", "https://your-frontend.vercel.app"})
 else:
     # Development: Allow all origins for demo flexibility
     # For production, set NODE_ENV=production and PRODUCTION_ORIGINS
-    allowed_origins = ["*"]  # Allow all origins in development
-    logger.info(f"Development mode: CORS allowing all origins")
+    allowed_origins = frozenset({"*"})  # Allow all origins in development
 
 # Configure CORS with wildcard handling compatible with credentials
 cors_kwargs = {
@@ -75,12 +85,16 @@ cors_kwargs = {
     "allow_methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     "allow_headers": ["Accept", "Accept-Language", "Content-Language", "Content-Type", "Authorization"],
     "expose_headers": ["Content-Length", "Content-Type", "Date", "Server"],
+    # Let browsers cache preflight responses instead of re-sending OPTIONS
+    "max_age": 86400,
 }
-if allowed_origins == ["*"] or ("*" in allowed_origins):
-    logger.warning("CORS configured with wildcard origins; using allow_origin_regex for compatibility with credentials")
+cors_wildcard = "*" in allowed_origins
+if cors_wildcard:
+    # A single compiled regex instead of a literal "*", which is incompatible with credentials
     cors_kwargs["allow_origin_regex"] = ".*"
-    cors_kwargs["allow_origins"] = []
+    cors_kwargs["allow_origins"] = frozenset()
 else:
+    # frozenset gives O(1) origin membership checks on every request
     cors_kwargs["allow_origins"] = allowed_origins
 
 app.add_middleware(CORSMiddleware, **cors_kwargs)
@@ -122,10 +136,10 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Test database connection
-        await db.get_claims()
+        await db.ping()
         db_status = "healthy"
     except Exception as e:
-        logger.error(f"Database health check failed: {str(e)}")
+        logger.error("Database health check failed: %s", e)
         db_status = f"unhealthy: {str(e)}"
 
     return {
@@ -153,7 +167,7 @@ async def not_found_handler(request, exc):
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     """Custom 500 handler"""
-    logger.error(f"Internal server error: {str(exc)}")
+    logger.error("Internal server error: %s", exc)
     return JSONResponse(status_code=500,
                         content={
                             "error": "Internal server error",
@@ -166,7 +180,7 @@ if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
 
-    logger.info(f"Starting server on {host}:{port}")
+    logger.info("Starting server on %s:%s", host, port)
     uvicorn.run("main:app",
                 host=host,
                 port=port,
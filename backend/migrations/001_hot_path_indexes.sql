@@ -0,0 +1,21 @@
+-- Indexes backing the hot WHERE clauses in backend/db.py
+--   claims:          WHERE status = $1 (GET /claims?status=...)
+--   recommendations: WHERE claim_id = $1 joined to schemes (GET /recommend/{claim_id}/history)
+--   claims.geom:     spatial lookups on the PostGIS geometry served by /map
+--
+-- CREATE INDEX CONCURRENTLY cannot run inside a transaction block, so run this
+-- file statement by statement (e.g. psql "$DATABASE_URL" -f 001_hot_path_indexes.sql)
+-- rather than through a wrapping migration transaction.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS claims_status_idx
+    ON claims (status);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS recommendations_claim_id_idx
+    ON recommendations (claim_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS claims_geom_gix
+    ON claims USING GIST (geom);
+
+-- Verify the planner now uses index scans:
+--   EXPLAIN ANALYZE SELECT * FROM claims WHERE status = 'pending';
+--   EXPLAIN ANALYZE SELECT * FROM recommendations WHERE claim_id = 1;
@@ -1,33 +1,65 @@
 from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
-from models import ClaimResponse, ErrorResponse
-from db import db
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from typing import AsyncIterator, List, Optional
+from models import ClaimResponse, ClaimStatus, ErrorResponse
+from db import db, claim_loader
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/claims", tags=["claims"])
 
+# Status filters accepted by GET /claims
+_VALID_STATUSES = frozenset(status.value for status in ClaimStatus)
+
+# Validates and encodes claim lists straight to JSON bytes in pydantic-core
+_claim_list_adapter = TypeAdapter(List[ClaimResponse])
+
+# Claims encoded per chunk of the streamed list
+CLAIMS_STREAM_CHUNK = 500
+
+def _encode_claims(claims: List[ClaimResponse]) -> bytes:
+    """Encode a chunk of claims as comma-separated JSON objects (no brackets)"""
+    return _claim_list_adapter.dump_json(claims)[1:-1]
+
+async def _stream_claims(claims: List[ClaimResponse]) -> AsyncIterator[bytes]:
+    """Write the claims list as one JSON array, a chunk at a time"""
+    try:
+        yield b"["
+        for start in range(0, len(claims), CLAIMS_STREAM_CHUNK):
+            yield (b"," if start else b"") + _encode_claims(claims[start:start + CLAIMS_STREAM_CHUNK])
+        yield b"]"
+    except Exception as e:
+        # The 200 is already sent; re-raising aborts the response, so the
+        # client sees a broken transfer rather than a short list
+        logger.error("Error streaming claims: %s", e)
+        raise
+
 @router.get("/", response_model=List[ClaimResponse])
 async def get_claims(status: Optional[str] = Query(None, description="Filter by status: granted, pending, or rejected")):
     """Get all claims, optionally filtered by status"""
     try:
-        if status and status not in ["granted", "pending", "rejected"]:
+        if status and status not in _VALID_STATUSES:
             raise HTTPException(status_code=400, detail="Status must be one of: granted, pending, rejected")
         
-        claims = await db.get_claims(status=status)
-        return claims
+        # Rows are fetched and validated before the response starts, so
+        # database and validation errors are still a 500 and the pooled
+        # connection is released before a slow client reads the body. Only
+        # the JSON encoding is streamed.
+        claims = _claim_list_adapter.validate_python(await db.get_claims(status=status))
+        return StreamingResponse(_stream_claims(claims), media_type="application/json")
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching claims: {str(e)}")
+        logger.error("Error fetching claims: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch claims: {str(e)}")
 
 @router.get("/{claim_id}", response_model=ClaimResponse)
 async def get_claim(claim_id: int):
     """Get a specific claim by ID"""
     try:
-        claim = await db.get_claim_by_id(claim_id)
+        claim = await claim_loader.load(claim_id)
         if not claim:
             raise HTTPException(status_code=404, detail="Claim not found")
         return claim
@@ -35,5 +67,5 @@ async def get_claim(claim_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching claim {claim_id}: {str(e)}")
+        logger.error("Error fetching claim %s: %s", claim_id, e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch claim: {str(e)}")
\ No newline at end of file
@@ -1,35 +1,48 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from typing import Optional
 from db import db
+import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/map", tags=["map"])
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against the current ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.replace("W/", "", 1) == etag for tag in candidates)
+
 @router.get("/")
-async def get_map_data():
+async def get_map_data(request: Request):
     """Get all claims as GeoJSON for map display"""
     try:
+        # Polling clients revalidate with If-None-Match and skip the payload if nothing changed
+        version = await db.get_map_version()
+        etag = f'"{hashlib.blake2b(version.encode(), digest_size=8).hexdigest()}"'
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
         logger.info("Fetching map data as GeoJSON")
-        geojson_data = await db.get_map_data()
+        geojson_payload = await db.get_map_geojson()
         
-        if not geojson_data:
+        if not geojson_payload:
             # Return empty FeatureCollection if no data
-            geojson_data = {
-                "type": "FeatureCollection",
-                "features": []
-            }
+            geojson_payload = b'{"type":"FeatureCollection","features":[]}'
         
-        logger.info(f"Returning GeoJSON with {len(geojson_data.get('features', []))} features")
+        logger.info("Returning GeoJSON payload (%s bytes)", len(geojson_payload))
         
-        # Return as JSON response with proper content type
-        return JSONResponse(
-            content=geojson_data,
-            headers={"Content-Type": "application/geo+json"}
+        # Payload is already serialized JSON (from Postgres or orjson), so skip re-encoding
+        return Response(
+            content=geojson_payload,
+            media_type="application/geo+json",
+            headers={"ETag": etag}
         )
     
     except Exception as e:
-        logger.error(f"Error fetching map data: {str(e)}")
+        logger.error("Error fetching map data: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch map data: {str(e)}")
 
 @router.get("/health")
@@ -2,7 +2,8 @@ from fastapi import APIRouter, HTTPException, Path
 from typing import List
 from models import RecommendationResponse, ErrorResponse
 from utils.rules import recommendation_engine
-from db import db
+from db import db, claim_loader
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,80 +13,92 @@ router = APIRouter(prefix="/recommend", tags=["recommendations"])
 async def get_recommendations(claim_id: int = Path(..., gt=0, description="ID of the claim to get recommendations for")):
     """Generate scheme recommendations for a specific claim"""
     try:
-        # Fetch the claim
-        claim = await db.get_claim_by_id(claim_id)
+        # Fetch the claim and available schemes concurrently
+        claim, db_schemes = await asyncio.gather(
+            claim_loader.load(claim_id),
+            db.get_schemes(),
+            return_exceptions=True
+        )
+        if isinstance(claim, Exception):
+            raise claim
         if not claim:
             raise HTTPException(status_code=404, detail="Claim not found")
         
-        logger.info(f"Generating recommendations for claim {claim_id}")
+        logger.info("Generating recommendations for claim %s", claim_id)
         
-        # Get available schemes from database (fallback to default schemes)
-        try:
-            db_schemes = await db.get_schemes()
-            logger.info(f"Found {len(db_schemes)} schemes in database")
-        except Exception as e:
-            logger.warning(f"Could not fetch schemes from database, using defaults: {str(e)}")
+        # Fall back to default schemes if the database fetch failed
+        if isinstance(db_schemes, Exception):
+            logger.warning("Could not fetch schemes from database, using defaults: %s", db_schemes)
             db_schemes = []
+        else:
+            logger.info("Found %s schemes in database", len(db_schemes))
         
         # Generate recommendations using the rule engine
         recommendations = recommendation_engine.get_recommendations(claim, db_schemes if db_schemes else None)
         
         if not recommendations:
-            logger.info(f"No recommendations found for claim {claim_id}")
+            logger.info("No recommendations found for claim %s", claim_id)
             return []
         
-        # Save recommendations to database and prepare response
-        response_recommendations = []
+        # Save all recommendations in a single insert and prepare response
+        rows = [
+            {"claim_id": claim_id, "scheme_id": rec["scheme_id"], "score": rec["score"]}
+            for rec in recommendations
+        ]
         
+        try:
+            saved_recs = await db.create_recommendations_bulk(rows)
+        except Exception as e:
+            logger.error("Failed to save recommendations for claim %s: %s", claim_id, e)
+            return []
+        
+        # Inserted rows are not guaranteed to come back in input order, so pair
+        # them with the recommendations by scheme
+        saved_by_scheme = {saved_rec["scheme_id"]: saved_rec for saved_rec in saved_recs}
+        if len(saved_recs) != len(rows) or saved_by_scheme.keys() != {row["scheme_id"] for row in rows}:
+            raise Exception(f"Saved {len(saved_recs)} of {len(rows)} recommendations")
+        
+        response_recommendations = []
         for rec in recommendations:
-            try:
-                # Save to database
-                recommendation_data = {
-                    "claim_id": claim_id,
-                    "scheme_id": rec["scheme_id"],
-                    "score": rec["score"]
-                }
-                
-                saved_rec = await db.create_recommendation(recommendation_data)
-                
-                if saved_rec:
-                    response_rec = {
-                        "id": saved_rec["id"],
-                        "claim_id": claim_id,
-                        "scheme_id": rec["scheme_id"],
-                        "scheme_name": rec["scheme_name"],
-                        "score": rec["score"],
-                        "created_at": saved_rec["created_at"]
-                    }
-                    response_recommendations.append(response_rec)
-                    logger.info(f"Saved recommendation: {rec['scheme_name']} (score: {rec['score']:.3f})")
-                
-            except Exception as e:
-                logger.error(f"Failed to save recommendation {rec['scheme_name']}: {str(e)}")
-                # Continue with other recommendations even if one fails
-                continue
+            saved_rec = saved_by_scheme[rec["scheme_id"]]
+            response_rec = {
+                "id": saved_rec["id"],
+                "claim_id": claim_id,
+                "scheme_id": rec["scheme_id"],
+                "scheme_name": rec["scheme_name"],
+                "score": rec["score"],
+                "created_at": saved_rec["created_at"]
+            }
+            response_recommendations.append(response_rec)
+            logger.info("Saved recommendation: %s (score: %.3f)", rec['scheme_name'], rec['score'])
         
-        logger.info(f"Generated {len(response_recommendations)} recommendations for claim {claim_id}")
+        logger.info("Generated %s recommendations for claim %s", len(response_recommendations), claim_id)
         return response_recommendations
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error generating recommendations for claim {claim_id}: {str(e)}")
+        logger.error("Error generating recommendations for claim %s: %s", claim_id, e)
         raise HTTPException(status_code=500, detail=f"Failed to generate recommendations: {str(e)}")
 
 @router.get("/{claim_id}/history", response_model=List[RecommendationResponse])
 async def get_recommendation_history(claim_id: int = Path(..., gt=0, description="ID of the claim")):
     """Get the history of recommendations for a specific claim"""
     try:
-        # Check if claim exists
-        claim = await db.get_claim_by_id(claim_id)
+        # Check the claim exists while fetching its recommendation history
+        claim, recommendations = await asyncio.gather(
+            claim_loader.load(claim_id),
+            db.get_recommendations_for_claim(claim_id),
+            return_exceptions=True
+        )
+        if isinstance(claim, Exception):
+            raise claim
+        # A missing claim is a 404 even if its history could not be fetched
         if not claim:
             raise HTTPException(status_code=404, detail="Claim not found")
-        
-        # Get recommendation history
-        recommendations = await db.get_recommendations_for_claim(claim_id)
-        
+        if isinstance(recommendations, Exception):
+            raise recommendations
+
         # Format response
         response_recommendations = []
         for rec in recommendations:
@@ -100,13 +113,13 @@ async def get_recommendation_history(claim_id: int = Path(..., gt=0, description
             }
             response_recommendations.append(response_rec)
         
-        logger.info(f"Retrieved {len(response_recommendations)} recommendation history items for claim {claim_id}")
+        logger.info("Retrieved %s recommendation history items for claim %s", len(response_recommendations), claim_id)
         return response_recommendations
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error fetching recommendation history for claim {claim_id}: {str(e)}")
+        logger.error("Error fetching recommendation history for claim %s: %s", claim_id, e)
         raise HTTPException(status_code=500, detail=f"Failed to fetch recommendation history: {str(e)}")
 
 @router.get("/health")
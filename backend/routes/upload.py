@@ -9,7 +9,7 @@ import logging
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/upload", tags=["upload"])
 
-ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif'}
+ALLOWED_EXTENSIONS = frozenset({'.pdf', '.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif'})
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
 @router.post("/", response_model=UploadResponse)
@@ -20,27 +20,30 @@ async def upload_file(file: UploadFile = File(...)):
         if not file.filename:
             raise HTTPException(status_code=400, detail="No file uploaded")
         
-        file_extension = '.' + file.filename.lower().split('.')[-1] if '.' in file.filename else ''
+        # Only the text after the last dot is lowered
+        _, dot, extension = file.filename.rpartition('.')
+        file_extension = dot + extension.lower() if dot else ''
         if file_extension not in ALLOWED_EXTENSIONS:
             raise HTTPException(
                 status_code=400, 
                 detail=f"Unsupported file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
             )
         
-        # Read file data
-        file_data = await file.read()
-        
-        # Check file size
+        # Check file size before reading when the upload declares it, and never
+        # read more than one byte past the limit into memory
+        if file.size is not None and file.size > MAX_FILE_SIZE:
+            raise HTTPException(status_code=400, detail="File too large. Maximum size: 10MB")
+        file_data = await file.read(MAX_FILE_SIZE + 1)
         if len(file_data) > MAX_FILE_SIZE:
             raise HTTPException(status_code=400, detail="File too large. Maximum size: 10MB")
         
-        logger.info(f"Processing uploaded file: {file.filename} ({len(file_data)} bytes)")
+        logger.info("Processing uploaded file: %s (%s bytes)", file.filename, len(file_data))
         
-        # Extract text using OCR
+        # Extract text using OCR (CPU-bound, runs off the event loop)
         try:
-            extracted_text = ocr_processor.process_file(file_data, file.filename)
+            extracted_text = await ocr_processor.process_file_async(file_data, file.filename)
         except Exception as e:
-            logger.error(f"OCR processing failed: {str(e)}")
+            logger.error("OCR processing failed: %s", e)
             return UploadResponse(
                 success=False,
                 message=f"Failed to extract text from file: {str(e)}",
@@ -58,7 +61,7 @@ async def upload_file(file: UploadFile = File(...)):
         try:
             extracted_data = nlp_processor.process_text(extracted_text)
         except Exception as e:
-            logger.error(f"NLP processing failed: {str(e)}")
+            logger.error("NLP processing failed: %s", e)
             return UploadResponse(
                 success=False,
                 message=f"Failed to process extracted text: {str(e)}",
@@ -69,7 +72,7 @@ async def upload_file(file: UploadFile = File(...)):
         required_fields = ["claimant_name", "village", "area", "status"]
         if not all(extracted_data.get(field) for field in required_fields):
             missing_fields = [field for field in required_fields if not extracted_data.get(field)]
-            logger.warning(f"Missing required fields: {missing_fields}")
+            logger.warning("Missing required fields: %s", missing_fields)
             
             return UploadResponse(
                 success=False,
@@ -95,7 +98,7 @@ async def upload_file(file: UploadFile = File(...)):
             if not created_claim:
                 raise Exception("Failed to create claim in database")
             
-            logger.info(f"Successfully created claim with ID: {created_claim.get('id')}")
+            logger.info("Successfully created claim with ID: %s", created_claim.get('id'))
             
             return UploadResponse(
                 success=True,
@@ -108,7 +111,7 @@ async def upload_file(file: UploadFile = File(...)):
             )
         
         except Exception as e:
-            logger.error(f"Database operation failed: {str(e)}")
+            logger.error("Database operation failed: %s", e)
             return UploadResponse(
                 success=False,
                 message=f"Failed to save claim to database: {str(e)}",
@@ -121,7 +124,7 @@ async def upload_file(file: UploadFile = File(...)):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in upload processing: {str(e)}")
+        logger.error("Unexpected error in upload processing: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/health")
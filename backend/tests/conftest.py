@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules import each other as top-level names (from db import db)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep backend/.env from pointing the tests at a real database; variables
+# exported in the shell still apply
+for name in ("SUPABASE_URL", "SUPABASE_KEY", "DATABASE_URL"):
+    os.environ.setdefault(name, "")
+
+from fastapi.testclient import TestClient
+
+from db import db
+from main import app
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "integration: tests that need a live database (DATABASE_URL)")
+
+
+@pytest.fixture
+def demo_db(monkeypatch):
+    """The shared database switched to fresh in-memory demo data"""
+    monkeypatch.setattr(db, "demo_mode", True)
+    monkeypatch.setattr(db, "supabase", None)
+    monkeypatch.setattr(db, "_pool", None)
+    db._init_demo_store(db._get_demo_claims())
+    return db
+
+
+@pytest.fixture
+def client(demo_db):
+    with TestClient(app) as client:
+        yield client
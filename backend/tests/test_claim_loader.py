@@ -0,0 +1,65 @@
+import asyncio
+
+from db import ClaimLoader
+
+
+class FakeDatabase:
+    """Records the batched lookups a ClaimLoader makes"""
+    demo_mode = False
+
+    def __init__(self, claims=(), error=None):
+        self.claims = {claim_id: {"id": claim_id} for claim_id in claims}
+        self.error = error
+        self.calls = []
+        self.release = None
+
+    async def get_claims_by_ids(self, claim_ids):
+        self.calls.append(sorted(claim_ids))
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return [self.claims[claim_id] for claim_id in claim_ids if claim_id in self.claims]
+
+
+def test_concurrent_loads_share_one_query():
+    database = FakeDatabase(claims=[1, 2])
+    loader = ClaimLoader(database)
+
+    async def load_all():
+        return await asyncio.gather(*(loader.load(claim_id) for claim_id in [1, 2, 1, 3]))
+
+    assert asyncio.run(load_all()) == [{"id": 1}, {"id": 2}, {"id": 1}, None]
+    assert database.calls == [[1, 2, 3]]
+
+
+def test_query_error_reaches_every_caller():
+    database = FakeDatabase(error=Exception("database unavailable"))
+    loader = ClaimLoader(database)
+
+    async def load_all():
+        return await asyncio.gather(loader.load(1), loader.load(1), loader.load(2), return_exceptions=True)
+
+    results = asyncio.run(load_all())
+    assert all(result is database.error for result in results)
+    assert database.calls == [[1, 2]]
+
+
+def test_loads_during_a_query_start_the_next_batch():
+    database = FakeDatabase(claims=[1, 2])
+    loader = ClaimLoader(database)
+
+    async def load_during_query():
+        database.release = asyncio.Event()
+        first = asyncio.ensure_future(loader.load(1))
+        while not database.calls:
+            await asyncio.sleep(0.001)
+        second = asyncio.ensure_future(loader.load(2))
+        await asyncio.sleep(0.01)
+        database.release.set()
+        return await first, await second
+
+    assert asyncio.run(load_during_query()) == ({"id": 1}, {"id": 2})
+    assert database.calls == [[1], [2]]
+    assert not loader._flush_tasks
+
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from db import db
+from routes import claims
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 500])
+def test_streamed_list_is_one_json_array(client, demo_db, monkeypatch, chunk_size):
+    monkeypatch.setattr(claims, "CLAIMS_STREAM_CHUNK", chunk_size)
+    response = client.get("/claims/")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert [claim["id"] for claim in json.loads(response.content)] == [1, 2, 3, 4, 5, 6]
+
+    # Same bytes as encoding the whole list at once
+    adapter = claims._claim_list_adapter
+    assert response.content == adapter.dump_json(adapter.validate_python(list(demo_db._demo_claims.values())))
+
+
+def test_status_filter(client):
+    response = client.get("/claims/?status=pending")
+    assert response.status_code == 200
+    assert {claim["status"] for claim in response.json()} == {"pending"}
+    assert client.get("/claims/?status=unknown").status_code == 400
+
+
+def test_empty_list(client, monkeypatch):
+    async def no_claims(status=None):
+        return []
+
+    monkeypatch.setattr(db, "get_claims", no_claims)
+    response = client.get("/claims/")
+    assert response.status_code == 200
+    assert response.content == b"[]"
+
+
+def test_database_and_validation_errors_fail_before_streaming(client, monkeypatch):
+    async def fail(status=None):
+        raise Exception("database unavailable")
+
+    monkeypatch.setattr(db, "get_claims", fail)
+    assert client.get("/claims/").status_code == 500
+
+    async def invalid_claims(status=None):
+        return [{"id": 1}]
+
+    monkeypatch.setattr(db, "get_claims", invalid_claims)
+    assert client.get("/claims/").status_code == 500
+
+
+def test_encoding_error_aborts_the_stream(client, monkeypatch, caplog):
+    encode = claims._encode_claims
+    calls = []
+
+    def fail_after_first_chunk(chunk):
+        calls.append(chunk)
+        if len(calls) > 1:
+            raise ValueError("cannot encode claim")
+        return encode(chunk)
+
+    monkeypatch.setattr(claims, "CLAIMS_STREAM_CHUNK", 2)
+    monkeypatch.setattr(claims, "_encode_claims", fail_after_first_chunk)
+    with pytest.raises(ValueError):
+        client.get("/claims/")
+    assert "Error streaming claims: cannot encode claim" in caplog.text
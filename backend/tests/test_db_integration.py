@@ -0,0 +1,33 @@
+import asyncio
+import os
+import ssl
+
+import asyncpg
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+async def check_connection(database_url: str):
+    conn = await asyncpg.connect(database_url, ssl=ssl.create_default_context())
+    try:
+        return await conn.fetchval("SELECT 1")
+    finally:
+        await conn.close()
+
+
+def test_connection():
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        pytest.skip("DATABASE_URL is not set; skipping database integration test")
+
+    assert asyncio.run(check_connection(database_url)) == 1
+
+
+if __name__ == "__main__":
+    url = os.environ["DATABASE_URL"]
+    print("Testing connection...")
+    try:
+        print(f"✅ Connection successful! Result: {asyncio.run(check_connection(url))}")
+    except Exception as e:
+        print(f"❌ Connection failed: {e}")
@@ -0,0 +1,33 @@
+import asyncio
+
+
+def test_unchanged_map_is_not_modified(client):
+    response = client.get("/map/")
+    assert response.status_code == 200
+    assert len(response.json()["features"]) == 6
+    etag = response.headers["etag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        revalidated = client.get("/map/", headers={"If-None-Match": if_none_match})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+        assert revalidated.content == b""
+
+
+def test_stale_etag_gets_the_map(client):
+    response = client.get("/map/", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/geo+json"
+    assert response.json()["type"] == "FeatureCollection"
+
+
+def test_new_claim_changes_the_etag(client, demo_db):
+    etag = client.get("/map/").headers["etag"]
+    asyncio.run(demo_db.create_claim({
+        "claimant_name": "Test Claimant", "village": "Test Village", "area": 1.0, "status": "pending"
+    }))
+
+    response = client.get("/map/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()["features"]) == 7
@@ -0,0 +1,45 @@
+import pytest
+
+from utils import nlp
+from utils.nlp import NLPProcessor, nlp_processor
+
+
+@pytest.mark.parametrize("text, area", [
+    ("क्षेत्रफल २.५ हेक्टेयर", 2.5),
+    ("Land record x २.५ y", 2.5),
+    ("Plot ٣.٥ units", 3.5),
+])
+def test_area_with_non_ascii_digits(text, area):
+    assert nlp_processor.process_text(text)["area"] == area
+
+
+def test_repeated_text_is_processed_once(monkeypatch):
+    processor = NLPProcessor()
+    process = processor._process_text
+    calls = []
+
+    def counting_process(text):
+        calls.append(text)
+        return process(text)
+
+    monkeypatch.setattr(processor, "_process_text", counting_process)
+    text = "Name: Ramesh Kumar village: Kanha area 3.5 hectare status approved"
+    first = processor.process_text(text)
+    first["area"] = 0.0
+    second = processor.process_text(text)
+
+    assert calls == [text]
+    # Callers get their own copy of the cached result
+    assert second == process(text)
+    assert second["area"] == 3.5
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(nlp, "NLP_CACHE_SIZE", 2)
+    processor = NLPProcessor()
+    calls = []
+    monkeypatch.setattr(processor, "_process_text", lambda text: calls.append(text) or {"text": text})
+
+    for text in ["a", "b", "a", "c", "a", "b"]:
+        processor.process_text(text)
+    assert calls == ["a", "b", "c", "b"]
@@ -0,0 +1,99 @@
+from PIL import Image
+
+from utils import ocr
+from utils.ocr import OCR_ERROR_TEXT, OCR_STRATEGIES, OCRProcessor
+
+
+class FakeTessBaseAPI:
+    """Records how OCRProcessor loads and configures Tesseract handles"""
+    created = []
+
+    def __init__(self, lang, oem, path=None):
+        self.lang = lang
+        self.settings = {}
+        self.runs = []
+        FakeTessBaseAPI.created.append(self)
+
+    def SetPageSegMode(self, psm):
+        self.settings['psm'] = psm
+
+    def SetVariable(self, name, value):
+        self.settings[name] = value
+        return True
+
+    def SetImage(self, image):
+        pass
+
+    def GetUTF8Text(self):
+        self.runs.append(dict(self.settings))
+        return "text"
+
+    def MeanTextConf(self):
+        return 90
+
+
+def test_strategies_share_one_handle_per_language(monkeypatch):
+    FakeTessBaseAPI.created = []
+    monkeypatch.setattr(ocr, "PyTessBaseAPI", FakeTessBaseAPI)
+    processor = OCRProcessor()
+    image = Image.new("L", (10, 10))
+
+    for _ in range(2):
+        for strategy in OCR_STRATEGIES:
+            assert processor._run_ocr(image, strategy) == ("text", 90)
+
+    apis = {api.lang: api for api in FakeTessBaseAPI.created}
+    assert len(FakeTessBaseAPI.created) == len(apis) == len({s['lang'] for s in OCR_STRATEGIES})
+
+    # Each run used its own strategy's settings, whatever ran before it
+    expected = {lang: [] for lang in apis}
+    for _ in range(2):
+        for strategy in OCR_STRATEGIES:
+            expected[strategy['lang']].append({
+                'psm': strategy['psm'],
+                'preserve_interword_spaces': '1' if strategy['preserve_spaces'] else '0',
+            })
+    assert {lang: api.runs for lang, api in apis.items()} == expected
+
+
+def test_preprocessing_failure_falls_back_to_original(monkeypatch, caplog):
+    def fail(*args, **kwargs):
+        raise ocr.cv2.error("no OpenCL device")
+
+    monkeypatch.setattr(ocr.cv2, "GaussianBlur", fail)
+    image = Image.new("RGB", (10, 10))
+    with caplog.at_level("DEBUG", logger="utils.ocr"):
+        assert OCRProcessor().preprocess_image(image) is image
+    assert "no OpenCL device" in caplog.text
+
+
+def test_identical_images_are_recognised_once(monkeypatch):
+    processor = OCRProcessor()
+    calls = []
+    monkeypatch.setattr(processor, "_recognize_image", lambda data: calls.append(data) or f"text {len(calls)}")
+
+    assert processor.extract_text_from_image(b"image") == "text 1"
+    assert processor.extract_text_from_image(b"image") == "text 1"
+    assert processor.extract_text_from_image(b"other") == "text 2"
+    assert calls == [b"image", b"other"]
+
+
+def test_ocr_errors_are_not_cached(monkeypatch):
+    processor = OCRProcessor()
+    results = [OCR_ERROR_TEXT, "text"]
+    monkeypatch.setattr(processor, "_recognize_image", lambda data: results.pop(0))
+
+    assert processor.extract_text_from_image(b"image") == OCR_ERROR_TEXT
+    assert processor.extract_text_from_image(b"image") == "text"
+    assert processor.extract_text_from_image(b"image") == "text"
+
+
+def test_ocr_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(ocr, "OCR_CACHE_SIZE", 2)
+    processor = OCRProcessor()
+    calls = []
+    monkeypatch.setattr(processor, "_recognize_image", lambda data: calls.append(data) or "text")
+
+    for data in [b"a", b"b", b"a", b"c", b"a", b"b"]:
+        processor.extract_text_from_image(data)
+    assert calls == [b"a", b"b", b"c", b"b"]
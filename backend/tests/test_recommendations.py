@@ -0,0 +1,40 @@
+from db import db
+
+
+def test_saved_rows_are_matched_by_scheme(client, monkeypatch):
+    create_bulk = db.create_recommendations_bulk
+
+    async def create_reversed(rows):
+        return list(reversed(await create_bulk(rows)))
+
+    monkeypatch.setattr(db, "create_recommendations_bulk", create_reversed)
+    response = client.post("/recommend/2")
+    assert response.status_code == 200
+    recommendations = response.json()
+    assert len(recommendations) > 1
+
+    saved = {rec["id"]: rec for rec in client.get("/recommend/2/history").json()}
+    for rec in recommendations:
+        assert saved[rec["id"]]["scheme_id"] == rec["scheme_id"]
+        assert saved[rec["id"]]["score"] == rec["score"]
+
+
+def test_missing_saved_row_is_an_error(client, monkeypatch):
+    create_bulk = db.create_recommendations_bulk
+
+    async def create_all_but_one(rows):
+        return (await create_bulk(rows))[1:]
+
+    monkeypatch.setattr(db, "create_recommendations_bulk", create_all_but_one)
+    response = client.post("/recommend/2")
+    assert response.status_code == 500
+    assert "Saved" in response.json()["detail"]
+
+
+def test_history_of_missing_claim_is_not_found(client, monkeypatch):
+    async def fail(claim_id):
+        raise Exception("recommendations unavailable")
+
+    monkeypatch.setattr(db, "get_recommendations_for_claim", fail)
+    assert client.get("/recommend/99/history").status_code == 404
+    assert client.get("/recommend/1/history").status_code == 500
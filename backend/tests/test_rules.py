@@ -0,0 +1,83 @@
+import itertools
+
+import pytest
+
+from utils.rules import RecommendationEngine
+
+NAN = float("nan")
+INF = float("inf")
+
+# Rule sets the column-wise scoring has to treat like calculate_scheme_score
+EDGE_RULES = [
+    {"min_area": 0.1, "max_area": None, "allowed_statuses": ["pending"], "priority_score": 0.9},
+    {"min_area": 0.5, "max_area": 5.0, "allowed_statuses": ["granted"], "priority_score": 0.6},
+    {"min_area": 0, "max_area": None, "allowed_statuses": [], "priority_score": 0.8},
+    {"min_area": -1, "max_area": None, "priority_score": 0.7},
+    {"min_area": -0.5, "max_area": 3.0, "priority_score": 0.7},
+    {"min_area": -INF, "max_area": NAN, "priority_score": 0.5},
+    {"min_area": NAN, "max_area": None, "priority_score": 0.9},
+    {"min_area": 0.1, "max_area": INF, "priority_score": 0.6},
+    {"min_area": 0.1, "max_area": None, "priority_score": NAN},
+    {"min_area": 1.0, "max_area": 0, "priority_score": INF},
+    {"min_area": True, "max_area": False, "priority_score": 2},
+    {"min_area": "1", "max_area": None, "priority_score": 0.9},
+    {"min_area": 0.1, "max_area": "4", "priority_score": 0.9},
+    {"min_area": 0.1, "max_area": None, "priority_score": "0.7"},
+    {"min_area": 0.1, "allowed_statuses": 5, "priority_score": 0.9},
+    {"min_area": 0.1, "allowed_statuses": "granted pending", "priority_score": 0.9},
+    {},
+]
+
+EDGE_SCHEMES = [
+    {"id": i, "scheme_name": name, "description": "", "eligibility_rules": rules}
+    for i, (rules, name) in enumerate(zip(EDGE_RULES, itertools.cycle(
+        ["Forest Scheme", "Community Scheme", "Tribal Scheme", "Plain Scheme"])), start=1)
+] + [
+    {"id": 100, "scheme_name": "No Rules Scheme", "description": "", "eligibility_rules": None},
+    {"scheme_name": "No Id Scheme", "description": "", "eligibility_rules": {"min_area": 0.1}},
+]
+
+CLAIMS = [
+    {"id": claim_id, "area": area, "status": status, "village": village, "claimant_name": name}
+    for claim_id, (area, status, village, name) in enumerate(itertools.product(
+        [0, 0.05, 1.0, 2.5, 7, -2, NAN, INF, -INF, "3.0", "nan"],
+        ["granted", "Pending", "rejected", ""],
+        ["Forest Village", "x"],
+        ["Adivasi", "x"],
+    ), start=1)
+]
+
+
+def scalar_recommendations(engine, claim, schemes):
+    """The ranking calculate_scheme_score gives, one scheme at a time"""
+    scored = [(engine.calculate_scheme_score(claim, scheme), scheme) for scheme in schemes]
+    ranked = sorted((pair for pair in scored if pair[0] > 0.3), key=lambda pair: pair[0], reverse=True)
+    return [(scheme["id"], score) for score, scheme in ranked[:5]]
+
+
+def assert_same_ranking(recommendations, expected):
+    assert [rec["scheme_id"] for rec in recommendations] == [scheme_id for scheme_id, _ in expected]
+    for rec, (_, score) in zip(recommendations, expected):
+        assert rec["score"] == pytest.approx(score, abs=1e-12)
+
+
+@pytest.mark.parametrize("schemes", [None, EDGE_SCHEMES], ids=["default", "edge"])
+def test_vectorised_scores_match_calculate_scheme_score(schemes):
+    engine = RecommendationEngine()
+    scheme_list = engine.default_schemes if schemes is None else schemes
+    expected = [scalar_recommendations(engine, claim, scheme_list) for claim in CLAIMS]
+
+    # Single claims, the batch path, and the batch again from the profile cache
+    for claim, claim_expected in zip(CLAIMS, expected):
+        assert_same_ranking(engine.get_recommendations(claim, schemes), claim_expected)
+    for _ in range(2):
+        for recommendations, claim_expected in zip(engine.get_recommendations_batch(CLAIMS, schemes), expected):
+            assert_same_ranking(recommendations, claim_expected)
+
+
+def test_nan_area_variation_is_stable():
+    engine = RecommendationEngine()
+    claim = {"id": 1, "area": "nan", "status": "pending", "village": "x", "claimant_name": "x"}
+    first = engine.get_recommendations(claim)
+    assert first
+    assert engine.get_recommendations(dict(claim)) == first
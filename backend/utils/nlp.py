@@ -1,13 +1,99 @@
 import re
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, Any
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Extraction results kept for repeated texts (retried or duplicate uploads)
+NLP_CACHE_SIZE = 256
+
+# Patterns are compiled once at import instead of on every extraction call
+#
+# Runs of letters/digits are only tried from their first character (the
+# (?<!..) right after it) and the lazy "Name.*?"/"Village.*?" scans stop at
+# the next keyword. Both keep the matches identical while holding the
+# backtracking engine to linear time on long OCR tokens.
+
+# Any Devanagari text 3-50 chars, taken as a Hindi name when present
+_HINDI_BLOCK_RE = re.compile(r"[\u0900-\u097F\s]{3,50}")
+
+# Name patterns, tried in order when no Hindi block is found
+_NAME_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"(?:श्री|श्रीमती|नाम)[\s:]*([\u0900-\u097F\s]{2,50})",
+        r"Mr\.?\s+([A-Za-z\s]{2,30})",
+        r"Mrs\.?\s+([A-Za-z\s]{2,30})",
+        r"([A-Z](?<![A-Za-z][A-Za-z])[a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)",  # Capitalized names
+        # Form field patterns
+        r"1\.?\s*([\u0900-\u097F\s]{3,30})",  # First field often name
+        r"Name(?:(?!name).)*?([\u0900-\u097F\s]{3,30})"
+    )
+)
+
+# Enhanced village extraction patterns
+_VILLAGE_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"(?:village|gram|panchayat|गांव|ग्राम)[\s:]+([A-Za-z\u0900-\u097F\s]{2,30})",
+        r"(?:at|in)\s+village\s+([A-Za-z\u0900-\u097F\s]{2,30})",
+        r"5\.?\s*([\u0900-\u097F\s]{2,30})",  # Field 5 is often village
+        r"Village(?:(?!village).)*?([\u0900-\u097F\s]{2,30})"
+    )
+)
+
+# Enhanced area extraction patterns
+_AREA_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"(\d(?<!\d\d)\d*(?:\.\d+)?)\s*(?:hectare|hectares|ha|acre|acres|हेक्टेयर)",
+        r"area[\s:]+(\d+(?:\.\d+)?)",
+        r"(\d(?<!\d\d)\d*(?:\.\d+)?)\s*(?:sq|sqm|square)",
+        r"(?:क्षेत्रफल|एरिया)[\s:]*(\d+(?:\.\d+)?)",
+        # Look for any decimal number that could be area (catch-alls, last)
+        r"(\d(?<!\d\d)\d*\.\d+)",
+        r"([0-9](?<![0-9][0-9])[0-9]*\.[0-9]+)"
+    )
+)
+
+# Status keywords, checked in priority order. Plain substring checks on the
+# lowered text beat a combined regex or automaton at form-sized inputs.
+_STATUS_KEYWORDS = (
+    ("granted", ("granted", "approved", "sanctioned", "accepted")),
+    ("pending", ("pending", "under review", "processing", "submitted")),
+    ("rejected", ("rejected", "denied", "declined", "cancelled")),
+)
+
+# Text cleaning: str.translate table that drops everything outside
+# [\w\s.:,-]. Filled lazily per code point, so only characters that
+# actually show up in OCR output are ever classified.
+class _KeepCharsTable(dict):
+    def __missing__(self, code: int):
+        char = chr(code)
+        keep = char.isalnum() or char.isspace() or char in "_.:,-"
+        value = code if keep else None
+        self[code] = value
+        return value
+
+_CLEAN_TABLE = _KeepCharsTable()
+
+def _normalize_name(name: str) -> str:
+    """Strip and title-case a claimant name.
+
+    Every name pattern captures either Latin-only or Devanagari-only text,
+    and Devanagari has no case, so a Devanagari first character means
+    title() would be a no-op walk over the whole string.
+    """
+    name = name.strip()
+    if name and "\u0900" <= name[0] <= "\u097F":
+        return name
+    return name.title()
+
 class NLPProcessor:
     def __init__(self):
+        # Text digest -> extracted fields, least recently used first
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
         logger.info("NLP processor initialized with regex-based extraction")
     
     def extract_entities_with_regex(self, text: str) -> Dict[str, Any]:
@@ -19,88 +105,47 @@ class NLPProcessor:
             "status": None
         }
         
-        # Enhanced name extraction patterns for Hindi forms
-        name_patterns = [
-            # Hindi patterns
-            r"[\u0900-\u097F\s]{3,50}",  # Any Devanagari text 3-50 chars
-            # English patterns
-            r"(?:name|claimant|applicant)[\s:]+([A-Za-z\u0900-\u097F\s]{2,50})",
-            r"(?:श्री|श्रीमती|नाम)[\s:]*([\u0900-\u097F\s]{2,50})",
-            r"Mr\.?\s+([A-Za-z\s]{2,30})",
-            r"Mrs\.?\s+([A-Za-z\s]{2,30})",
-            r"([A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)",  # Capitalized names
-            # Form field patterns
-            r"1\.?\s*([\u0900-\u097F\s]{3,30})",  # First field often name
-            r"Name.*?([\u0900-\u097F\s]{3,30})"
-        ]
-        
-        # Try to find Hindi text first
-        hindi_matches = re.findall(r"[\u0900-\u097F\s]{3,50}", text)
-        if hindi_matches:
-            # Take the first substantial Hindi text as name
-            for match in hindi_matches:
-                clean_match = match.strip()
-                if len(clean_match) > 3 and len(clean_match) < 50:
-                    extracted["claimant_name"] = clean_match
-                    break
+        # Try to find Hindi text first, taking the first substantial block as
+        # name; finditer stops scanning as soon as one is found
+        for match in _HINDI_BLOCK_RE.finditer(text):
+            clean_match = match.group().strip()
+            if len(clean_match) > 3 and len(clean_match) < 50:
+                extracted["claimant_name"] = clean_match
+                break
         
-        # Fallback to English patterns if no Hindi found
+        # Fallback to other name patterns if no Hindi found
         if not extracted["claimant_name"]:
-            for pattern in name_patterns[2:]:  # Skip Hindi patterns
-                match = re.search(pattern, text, re.IGNORECASE)
+            for pattern in _NAME_PATTERNS:
+                match = pattern.search(text)
                 if match:
                     extracted["claimant_name"] = match.group(1).strip()
                     break
         
-        # Enhanced village extraction patterns
-        village_patterns = [
-            r"(?:village|gram|panchayat|गांव|ग्राम)[\s:]+([A-Za-z\u0900-\u097F\s]{2,30})",
-            r"(?:at|in)\s+village\s+([A-Za-z\u0900-\u097F\s]{2,30})",
-            r"5\.?\s*([\u0900-\u097F\s]{2,30})",  # Field 5 is often village
-            r"Village.*?([\u0900-\u097F\s]{2,30})"
-        ]
-        
-        for pattern in village_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _VILLAGE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 village_name = match.group(1).strip()
                 if len(village_name) > 1:
                     extracted["village"] = village_name
                     break
         
-        # Enhanced area extraction patterns
-        area_patterns = [
-            r"(\d+(?:\.\d+)?)\s*(?:hectare|hectares|ha|acre|acres|हेक्टेयर)",
-            r"area[\s:]+(\d+(?:\.\d+)?)",
-            r"(\d+(?:\.\d+)?)\s*(?:sq|sqm|square)",
-            r"(?:क्षेत्रफल|एरिया)[\s:]*(\d+(?:\.\d+)?)",
-            # Look for any decimal number that could be area
-            r"(\d+\.\d+)\s*(?:hectare|ha)?",
-            r"([0-9]+\.[0-9]+)"
-        ]
-        
-        for pattern in area_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
+        # finditer stops at the first plausible value instead of collecting
+        # every number in the document first
+        for pattern in _AREA_PATTERNS:
+            for match in pattern.finditer(text):
                 try:
-                    area_val = float(match if isinstance(match, str) else match[0])
-                    if 0.1 <= area_val <= 100:  # Reasonable area range
-                        extracted["area"] = area_val
-                        break
-                except (ValueError, IndexError):
+                    area_val = float(match.group(1))
+                except ValueError:
                     continue
+                if 0.1 <= area_val <= 100:  # Reasonable area range
+                    extracted["area"] = area_val
+                    break
             if extracted["area"]:
                 break
         
         # Status extraction
-        status_keywords = {
-            "granted": ["granted", "approved", "sanctioned", "accepted"],
-            "pending": ["pending", "under review", "processing", "submitted"],
-            "rejected": ["rejected", "denied", "declined", "cancelled"]
-        }
-        
         text_lower = text.lower()
-        for status, keywords in status_keywords.items():
+        for status, keywords in _STATUS_KEYWORDS:
             if any(keyword in text_lower for keyword in keywords):
                 extracted["status"] = status
                 break
@@ -108,9 +153,28 @@ class NLPProcessor:
         return extracted
     
     def process_text(self, text: str) -> Dict[str, Any]:
-        """Main method to process text and extract relevant information"""
+        """Main method to process text and extract relevant information,
+        reusing the result for identical text"""
+        key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+        with self._cache_lock:
+            extracted = self._cache.get(key)
+            if extracted is not None:
+                self._cache.move_to_end(key)
+                logger.info("NLP cache hit")
+                return dict(extracted)
+        
+        extracted = self._process_text(text)
+        with self._cache_lock:
+            self._cache[key] = dict(extracted)
+            self._cache.move_to_end(key)
+            if len(self._cache) > NLP_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return extracted
+    
+    def _process_text(self, text: str) -> Dict[str, Any]:
+        """Clean the text, extract entities and fill in defaults"""
         try:
-            logger.info(f"Processing text of length: {len(text)} characters")
+            logger.info("Processing text of length: %s characters", len(text))
             
             # Clean the text
             cleaned_text = self._clean_text(text)
@@ -121,19 +185,19 @@ class NLPProcessor:
             # Validate and set defaults
             extracted = self._validate_and_set_defaults(extracted)
             
-            logger.info(f"Extracted entities: {extracted}")
+            logger.info("Extracted entities: %s", extracted)
             return extracted
         
         except Exception as e:
-            logger.error(f"NLP processing failed: {str(e)}")
+            logger.error("NLP processing failed: %s", e)
             raise Exception(f"Failed to process text: {str(e)}")
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = ' '.join(text.split())
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\.:,-]', '', text)
+        text = text.translate(_CLEAN_TABLE)
         return text.strip()
     
     def _validate_and_set_defaults(self, extracted: Dict[str, Any]) -> Dict[str, Any]:
@@ -148,7 +212,7 @@ class NLPProcessor:
         
         # Clean up name and village
         if extracted["claimant_name"]:
-            extracted["claimant_name"] = extracted["claimant_name"].title().strip()
+            extracted["claimant_name"] = _normalize_name(extracted["claimant_name"])
         else:
             extracted["claimant_name"] = "Unknown Claimant"
         
@@ -1,33 +1,113 @@
-import pytesseract
+import os
+
+# Tesseract's own OpenMP threads fight with request-level concurrency; keep
+# one per recognition and scale with threads instead. Must be set before the
+# library is loaded.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 from PIL import Image, ImageEnhance, ImageFilter
 import io
-import os
+import asyncio
+import hashlib
 import cv2
 import numpy as np
-from typing import Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Tuple
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# In-process Tesseract API: no subprocess/temp file per call and the GIL is
+# released during recognition
+from tesserocr import PyTessBaseAPI, OEM
+
 logger = logging.getLogger(__name__)
 
+# OCR strategies tried in order (psm: Tesseract page segmentation mode)
+OCR_STRATEGIES = (
+    # Strategy 1: Hindi + English combined
+    {'lang': 'hin+eng', 'psm': 6, 'preserve_spaces': True},
+    # Strategy 2: Hindi only with form detection
+    {'lang': 'hin', 'psm': 4, 'preserve_spaces': True},
+    # Strategy 3: English only with form detection
+    {'lang': 'eng', 'psm': 6, 'preserve_spaces': False},
+    # Strategy 4: English with different PSM for mixed content
+    {'lang': 'eng', 'psm': 4, 'preserve_spaces': False},
+    # Strategy 5: Auto language detection
+    {'lang': 'eng', 'psm': 3, 'preserve_spaces': False},
+)
+
+# Stop the cascade early once Tesseract is this confident (mean word
+# confidence, 0-100) in a result of at least OCR_CONFIDENT_MIN_CHARS
+OCR_CONFIDENT_SCORE = 70
+OCR_CONFIDENT_MIN_CHARS = 50
+
+# Small images are upscaled until the short side reaches OCR_MIN_SIDE, capped
+# so the long side never exceeds OCR_MAX_SIDE
+OCR_MIN_SIDE = 1200
+OCR_MAX_SIDE = 2400
+
+# Number of OCR results kept in memory, keyed by a hash of the image bytes
+OCR_CACHE_SIZE = 256
+
+# Returned when an image could not be processed; never cached
+OCR_ERROR_TEXT = "Error processing image for OCR"
+
+# Basic English OCR used when every strategy comes back (nearly) empty
+FALLBACK_STRATEGY = {'lang': 'eng', 'psm': 3, 'preserve_spaces': False}
+
 class OCRProcessor:
     def __init__(self):
-        # Configure tesseract path if needed (for Windows/different installations)
-        # pytesseract.pytesseract.tesseract_cmd = r'/usr/bin/tesseract'  # Linux default
-        pass
+        # PyTessBaseAPI handles are not thread-safe, so each thread keeps
+        # its own, one per language model, for the lifetime of the process
+        self._local = threading.local()
+        # Recognition releases the GIL under tesserocr, so uploads are OCR'd
+        # in parallel; threads are only started on first use. Every thread
+        # holds its own language models, so the pool is capped (OCR_MAX_WORKERS)
+        max_workers = int(os.getenv("OCR_MAX_WORKERS", min(4, os.cpu_count() or 1)))
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr")
+        # LRU of recent results so re-uploads of the same image skip Tesseract
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def _get_api(self, lang: str):
+        """Return this thread's Tesseract handle for a language, loading its
+        model on first use"""
+        apis = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+        api = apis.get(lang)
+        if api is None:
+            kwargs = {'lang': lang, 'oem': OEM.DEFAULT}
+            # Wheels don't know the system tessdata location; share the CLI's
+            tessdata = os.getenv('TESSDATA_PREFIX')
+            if tessdata:
+                kwargs['path'] = tessdata
+            api = apis[lang] = PyTessBaseAPI(**kwargs)
+        return api
+    
+    def _run_ocr(self, image, strategy: Dict[str, Any]) -> Tuple[str, int]:
+        """Run a single OCR strategy on a PIL image, returning (text, mean word confidence)"""
+        api = self._get_api(strategy['lang'])
+        # Strategies share a language's handle, so apply this one's settings
+        api.SetPageSegMode(strategy['psm'])
+        api.SetVariable('preserve_interword_spaces', '1' if strategy['preserve_spaces'] else '0')
+        api.SetImage(image)
+        return api.GetUTF8Text(), api.MeanTextConf()
     
     def preprocess_image(self, image):
         """Preprocess image for better OCR results"""
         try:
-            # Convert PIL to OpenCV format
-            img_array = np.array(image)
+            # Convert PIL to OpenCV format. The UMat keeps the whole chain on
+            # OpenCV's side (OpenCL device when available, CPU otherwise) and
+            # is only copied back once at the end.
+            img_array = np.asarray(image)
             
             # Convert to grayscale
             if len(img_array.shape) == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+                gray = cv2.cvtColor(cv2.UMat(img_array), cv2.COLOR_RGB2GRAY)
             else:
-                gray = img_array
+                gray = cv2.UMat(img_array)
             
             # Apply Gaussian blur to reduce noise
             blurred = cv2.GaussianBlur(gray, (5, 5), 0)
@@ -36,12 +116,33 @@ class OCRProcessor:
             thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
             
             # Convert back to PIL
-            return Image.fromarray(thresh)
-        except:
-            # Fallback to original image if preprocessing fails
+            return Image.fromarray(thresh.get())
+        except Exception as e:
+            # Fallback to original image if preprocessing fails (cv2.error
+            # included, e.g. an OpenCL/UMat failure)
+            logger.debug("Image preprocessing failed, using original image: %s", e)
             return image
     
     def extract_text_from_image(self, image_data: bytes) -> str:
+        """Extract text from image using OCR, reusing the result for identical bytes"""
+        key = hashlib.blake2b(image_data, digest_size=16).hexdigest()
+        with self._cache_lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+                logger.info("OCR cache hit")
+                return text
+        
+        text = self._recognize_image(image_data)
+        if text != OCR_ERROR_TEXT:
+            with self._cache_lock:
+                self._cache[key] = text
+                self._cache.move_to_end(key)
+                if len(self._cache) > OCR_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return text
+    
+    def _recognize_image(self, image_data: bytes) -> str:
         """Extract text from image using OCR with robust Hindi and English support"""
         try:
             # Convert bytes to PIL Image
@@ -51,78 +152,62 @@ class OCRProcessor:
             if image.mode != 'RGB':
                 image = image.convert('RGB')
             
-            # Resize image if too small (OCR works better on larger images)
+            # Resize image if too small (OCR works better on larger images),
+            # without letting the long side grow past OCR_MAX_SIDE
             width, height = image.size
-            if width < 1200 or height < 1200:
-                scale = max(1200/width, 1200/height)
+            scale = max(1.0, min(OCR_MIN_SIDE / min(width, height), OCR_MAX_SIDE / max(width, height)))
+            if scale > 1.0:
                 new_size = (int(width * scale), int(height * scale))
-                image = image.resize(new_size, Image.LANCZOS)
+                image = Image.fromarray(cv2.resize(np.asarray(image), new_size, interpolation=cv2.INTER_CUBIC))
             
             # Apply preprocessing
             processed_image = self.preprocess_image(image)
             
             # Try multiple language combinations with different strategies
             best_text = ""
-            strategies = [
-                # Strategy 1: Hindi + English combined
-                {'lang': 'hin+eng', 'config': r'--oem 3 --psm 6 -c preserve_interword_spaces=1'},
-                # Strategy 2: Hindi only with form detection
-                {'lang': 'hin', 'config': r'--oem 3 --psm 4 -c preserve_interword_spaces=1'},
-                # Strategy 3: English only with form detection
-                {'lang': 'eng', 'config': r'--oem 3 --psm 6'},
-                # Strategy 4: English with different PSM for mixed content
-                {'lang': 'eng', 'config': r'--oem 3 --psm 4'},
-                # Strategy 5: Auto language detection
-                {'lang': 'eng', 'config': r'--oem 3 --psm 3'},
-            ]
-            
-            for strategy in strategies:
+            for strategy in OCR_STRATEGIES:
                 try:
                     # Try with processed image first
-                    text = pytesseract.image_to_string(
-                        processed_image, 
-                        lang=strategy['lang'], 
-                        config=strategy['config']
-                    )
+                    text, confidence = self._run_ocr(processed_image, strategy)
                     
                     # If processed image didn't work well, try original
                     if len(text.strip()) < 20:
-                        text = pytesseract.image_to_string(
-                            image, 
-                            lang=strategy['lang'], 
-                            config=strategy['config']
-                        )
+                        text, confidence = self._run_ocr(image, strategy)
                     
                     # Keep the best result (longest meaningful text)
                     if len(text.strip()) > len(best_text.strip()):
                         best_text = text
-                        logger.info(f"OCR success with {strategy['lang']}: {len(text)} characters")
+                        logger.info("OCR success with %s: %s characters", strategy['lang'], len(text))
                     
                     # If we got substantial text, we can stop trying
                     if len(text.strip()) > 100:
                         break
+                    
+                    # Shorter text is still good enough if Tesseract is confident in it
+                    if confidence >= OCR_CONFIDENT_SCORE and len(text.strip()) > OCR_CONFIDENT_MIN_CHARS:
+                        break
                         
                 except Exception as e:
-                    logger.warning(f"OCR failed for {strategy['lang']}: {str(e)}")
+                    logger.warning("OCR failed for %s: %s", strategy['lang'], e)
                     continue
             
             # Final fallback: try basic English OCR with minimal config
             if len(best_text.strip()) < 10:
                 try:
-                    fallback_text = pytesseract.image_to_string(image, lang='eng')
+                    fallback_text, _ = self._run_ocr(image, FALLBACK_STRATEGY)
                     if len(fallback_text.strip()) > len(best_text.strip()):
                         best_text = fallback_text
-                        logger.info(f"Fallback OCR used: {len(fallback_text)} characters")
+                        logger.info("Fallback OCR used: %s characters", len(fallback_text))
                 except:
                     pass
             
             result = best_text.strip() if best_text.strip() else "No text could be extracted from image"
-            logger.info(f"Final OCR result: {len(result)} characters")
+            logger.info("Final OCR result: %s characters", len(result))
             return result
                 
         except Exception as e:
-            logger.error(f"OCR processing failed: {str(e)}")
-            return "Error processing image for OCR"
+            logger.error("OCR processing failed: %s", e)
+            return OCR_ERROR_TEXT
     
     def extract_text_from_pdf(self, pdf_data: bytes) -> str:
         """Extract text from PDF file"""
@@ -137,7 +222,7 @@ class OCRProcessor:
             return "PDF processing requires additional setup"
         
         except Exception as e:
-            logger.error(f"PDF processing failed: {str(e)}")
+            logger.error("PDF processing failed: %s", e)
             raise Exception(f"Failed to extract text from PDF: {str(e)}")
     
     def process_file(self, file_data: bytes, filename: str) -> str:
@@ -150,6 +235,10 @@ class OCRProcessor:
             return self.extract_text_from_pdf(file_data)
         else:
             raise ValueError(f"Unsupported file type: {file_extension}")
+    
+    async def process_file_async(self, file_data: bytes, filename: str) -> str:
+        """Run process_file on the OCR worker threads so the event loop stays free"""
+        return await asyncio.wrap_future(self._pool.submit(self.process_file, file_data, filename))
 
 # Global OCR processor instance
 ocr_processor = OCRProcessor()
\ No newline at end of file
@@ -1,11 +1,232 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import heapq
 import logging
+import math
+import threading
+from collections import OrderedDict
+import numpy as np
 from models import ClaimResponse
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Status-specific bonuses
+STATUS_BONUSES = {
+    "pending": 0.1,   # Higher for pending (need support)
+    "granted": 0.15,  # Highest for granted (can implement)
+    "rejected": -0.05  # Small penalty but still eligible
+}
+
+_TINY = np.finfo(float).tiny
+_LOG_10 = math.log(10)
+
+# Scored claim profiles kept per scheme list
+SCORE_CACHE_SIZE = 4096
+
+def _pair_variation(claim_id: Any, scheme_id: Any, claim_area: float) -> float:
+    """Deterministic ±4% score variation for a claim-scheme pair, taken from
+    the low 32 bits of the pair's hash instead of reseeding the global RNG"""
+    if claim_area != claim_area:
+        # hash() of a NaN depends on the object from Python 3.10 on
+        claim_area = math.nan
+    unit = (hash((claim_id, scheme_id, claim_area)) & 0xFFFFFFFF) * (1.0 / 0xFFFFFFFF)
+    return (unit - 0.5) * 0.08
+
+def _is_number(value: Any) -> bool:
+    """Whether a rule value can take part in the score arithmetic"""
+    return isinstance(value, (int, float))
+
+class _SchemeTable:
+    """Eligibility rules of a scheme list laid out column-wise (one NumPy array
+    per rule) so a claim is scored against every scheme with a few vector ops.
+    
+    Schemes whose rules would make calculate_scheme_score fail are marked
+    invalid and never recommended, as before.
+    """
+    
+    def __init__(self, schemes: List[Dict[str, Any]]):
+        self.schemes = list(schemes)
+        count = len(self.schemes)
+        self.valid = np.zeros(count, dtype=bool)
+        self.min_area = np.zeros(count)
+        self.max_area = np.zeros(count)
+        self.bounded = np.zeros(count, dtype=bool)
+        self.priority = np.zeros(count)
+        self.forest = np.zeros(count, dtype=bool)
+        self.community = np.zeros(count, dtype=bool)
+        self.tribal = np.zeros(count, dtype=bool)
+        self.allowed_statuses: List[Any] = [None] * count
+        self._status_masks: Dict[str, np.ndarray] = {}
+        # Claim profile -> (eligible, score) rows, least recently used first
+        self._scored: "OrderedDict[tuple, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._scored_lock = threading.Lock()
+        
+        for i, scheme in enumerate(self.schemes):
+            try:
+                # Recommendations are built from the scheme id
+                if "id" not in scheme:
+                    logger.error("Error reading scheme rules: scheme %r has no id", scheme.get("scheme_name"))
+                    continue
+                rules = scheme["eligibility_rules"]
+                scheme_name = scheme["scheme_name"].lower()
+                min_area = rules.get("min_area", 0)
+                max_area = rules.get("max_area")
+                priority = rules.get("priority_score", 0.5)
+                allowed_statuses = rules.get("allowed_statuses", [])
+            except Exception as e:
+                logger.error("Error reading scheme rules: %s", e)
+                continue
+            
+            if not _is_number(min_area) or not _is_number(priority):
+                continue
+            if max_area and not _is_number(max_area):
+                continue
+            
+            self.valid[i] = True
+            self.min_area[i] = min_area
+            self.bounded[i] = bool(max_area)
+            self.max_area[i] = max_area if max_area else 0
+            self.priority[i] = priority
+            self.forest[i] = "forest" in scheme_name
+            self.community[i] = "community" in scheme_name
+            self.tribal[i] = "tribal" in scheme_name
+            self.allowed_statuses[i] = allowed_statuses
+        
+        # Claim-independent parts of the area and location terms
+        with np.errstate(all="ignore"):
+            self.optimal_area = (self.min_area + self.max_area) / 2
+        self.fit_scale = np.where(1 > self.optimal_area, 1, self.optimal_area)
+        # The log bonus of unlimited schemes raised (dropping the scheme) on a
+        # zero min_area, or on a non-positive argument, only possible when
+        # min_area is negative
+        unbounded = self.valid & ~self.bounded
+        self.log_always_fails = unbounded & (self.min_area == 0)
+        self.log_may_fail = unbounded & (self.min_area < 0)
+        self.log_divisor = np.where(self.min_area == 0, 1, self.min_area)
+        self.forest_bonus = np.where(self.forest, 0.1, 0.0)
+        self.community_bonus = np.where(self.community, 0.08, 0.0)
+        self.tribal_bonus = np.where(self.tribal, 0.12, 0.0)
+    
+    def status_mask(self, claim_status: str) -> np.ndarray:
+        """Schemes open to a claim status (an empty allow-list admits all)"""
+        mask = self._status_masks.get(claim_status)
+        if mask is None:
+            allowed = []
+            for statuses in self.allowed_statuses:
+                try:
+                    allowed.append(not statuses or claim_status in statuses)
+                except Exception:
+                    allowed.append(False)
+            mask = self._status_masks[claim_status] = np.array(allowed, dtype=bool)
+        return mask
+    
+    def score(self, claims: List["_ClaimFields"]) -> Tuple[np.ndarray, np.ndarray]:
+        """Return claims x schemes (eligible, score) matrices before the
+        per-pair variation and clamping
+        
+        Claims sharing a profile share their rows, so each distinct profile
+        is scored once and then served from an LRU cache.
+        """
+        rows: Dict[tuple, Optional[Tuple[np.ndarray, np.ndarray]]] = dict.fromkeys(claim.profile for claim in claims)
+        with self._scored_lock:
+            for profile in rows:
+                cached = self._scored.get(profile)
+                if cached is not None:
+                    self._scored.move_to_end(profile)
+                    rows[profile] = cached
+        
+        missing = [profile for profile, row in rows.items() if row is None]
+        if missing:
+            eligible, score = self._score_profiles(missing)
+            with self._scored_lock:
+                for i, profile in enumerate(missing):
+                    rows[profile] = self._scored[profile] = (eligible[i].copy(), score[i].copy())
+                    self._scored.move_to_end(profile)
+                while len(self._scored) > SCORE_CACHE_SIZE:
+                    self._scored.popitem(last=False)
+        
+        if len(claims) == 1:
+            eligible_row, score_row = rows[claims[0].profile]
+            return eligible_row[None], score_row[None]
+        return (np.array([rows[claim.profile][0] for claim in claims], dtype=bool).reshape(len(claims), len(self.schemes)),
+                np.array([rows[claim.profile][1] for claim in claims], dtype=float).reshape(len(claims), len(self.schemes)))
+    
+    def _score_profiles(self, profiles: List[tuple]) -> Tuple[np.ndarray, np.ndarray]:
+        """Score distinct claim profiles against every scheme
+        
+        Mirrors calculate_scheme_score term by term, in the same order. Its
+        max()/min() clamps return the bound for a NaN, so the NumPy versions
+        are written as comparisons that do the same.
+        """
+        claim_areas = [profile[0] for profile in profiles]
+        status_masks = [self.status_mask(profile[1]) for profile in profiles]
+        status_bonuses = [STATUS_BONUSES.get(profile[1], 0) for profile in profiles]
+        in_forest = [profile[2] for profile in profiles]
+        in_village = [profile[3] for profile in profiles]
+        tribal_name = [profile[4] for profile in profiles]
+        
+        claim_area = np.array(claim_areas)[:, None]
+        
+        eligible = self.valid & ~(claim_area < self.min_area) & ~(self.bounded & (claim_area > self.max_area))
+        eligible &= status_masks[0] if len(profiles) == 1 else np.array(status_masks)
+        
+        # NaN and infinite rules or areas are scored like the scalar path does
+        with np.errstate(all="ignore"):
+            # Perfect fit bonus (bell curve)
+            area_fit = 1 - np.abs(claim_area - self.optimal_area) / self.fit_scale
+            fit_bonus = 0.2 * np.where(area_fit > 0, area_fit, 0.0)
+            
+            # Logarithmic scaling for unlimited schemes (arguments below the
+            # smallest float only occur for schemes dropped below)
+            log_arg = 1 + claim_area / self.log_divisor
+            area_bonus = 0.15 * np.log(np.maximum(log_arg, _TINY)) / _LOG_10
+            log_bonus = np.where(area_bonus < 0.25, area_bonus, 0.25)
+            
+            area_applies = self.min_area <= claim_area
+            if self.log_always_fails.any():
+                eligible &= ~(area_applies & self.log_always_fails)
+            if self.log_may_fail.any():
+                eligible &= ~(area_applies & self.log_may_fail & (log_arg <= 0))
+            
+            score = self.priority + np.where(area_applies, np.where(self.bounded, fit_bonus, log_bonus), 0.0)
+            score += status_bonuses[0] if len(profiles) == 1 else np.array(status_bonuses)[:, None]
+        
+        # Location-based adjustments
+        self._add_bonus(score, in_forest, self.forest_bonus)  # Forest schemes for forest areas
+        self._add_bonus(score, in_village, self.community_bonus)  # Community schemes for villages
+        
+        # Name-based cultural matching
+        self._add_bonus(score, tribal_name, self.tribal_bonus)  # Tribal schemes for tribal names
+        
+        return eligible, score
+    
+    @staticmethod
+    def _add_bonus(score: np.ndarray, applies: List[bool], bonus: np.ndarray) -> None:
+        """Add a per-scheme bonus to the rows of the claims it applies to"""
+        if all(applies):
+            score += bonus
+        elif any(applies):
+            # Adding 0.0 leaves the other rows' scores bit-for-bit unchanged
+            score += np.where(np.array(applies)[:, None], bonus, 0.0)
+
+class _ClaimFields:
+    """Normalized claim fields used for scoring"""
+    __slots__ = ("id", "area", "status", "village", "name", "profile")
+    
+    def __init__(self, claim: Dict[str, Any]):
+        self.id = claim.get('id', 0)
+        self.area = float(claim.get("area", 0))
+        self.status = claim.get("status", "").lower()
+        self.village = claim.get("village", "").lower()
+        self.name = claim.get("claimant_name", "").lower()
+        # Everything the base scheme scores depend on
+        self.profile = (
+            self.area,
+            self.status,
+            "forest" in self.village or "jungle" in self.village,
+            "village" in self.village,
+            any(word in self.name for word in ["adivasi", "tribal", "गोंड", "श्री"]),
+        )
+
 class RecommendationEngine:
     def __init__(self):
         """Initialize the rule-based recommendation engine"""
@@ -121,6 +342,29 @@ class RecommendationEngine:
                 }
             }
         ]
+        # Column-wise rules for the default schemes and the last scheme list
+        # passed in (the database list is reused while it is cached)
+        self._default_table: Optional[_SchemeTable] = None
+        self._schemes_table: Optional[Tuple[Tuple[int, ...], _SchemeTable]] = None
+        # Id handed to the next custom scheme
+        self._next_id = 1 + max((s["id"] for s in self.default_schemes), default=0)
+    
+    def warm_up(self) -> None:
+        """Build and score the default scheme table ahead of the first request"""
+        self._table_for(self.default_schemes)._score_profiles([(1.0, "pending", False, False, False)])
+    
+    def _table_for(self, schemes: List[Dict[str, Any]]) -> _SchemeTable:
+        """Return the column-wise rules for a scheme list, built once per list"""
+        if schemes is self.default_schemes:
+            if self._default_table is None:
+                self._default_table = _SchemeTable(schemes)
+            return self._default_table
+        
+        # Keyed on the scheme objects; the table holds references so ids stay unique
+        key = tuple(map(id, schemes))
+        if self._schemes_table is None or self._schemes_table[0] != key:
+            self._schemes_table = (key, _SchemeTable(schemes))
+        return self._schemes_table[1]
     
     def calculate_scheme_score(self, claim: Dict[str, Any], scheme: Dict[str, Any]) -> float:
         """Calculate dynamic compatibility score between claim and scheme"""
@@ -150,17 +394,11 @@ class RecommendationEngine:
                     score += 0.2 * max(0, area_fit)
                 else:
                     # Logarithmic scaling for unlimited schemes
-                    import math
-                    area_bonus = 0.15 * math.log(1 + claim_area / min_area) / math.log(10)
+                    area_bonus = 0.15 * math.log(1 + claim_area / min_area) / _LOG_10
                     score += min(0.25, area_bonus)
             
             # Status-specific bonuses
-            status_bonuses = {
-                "pending": 0.1,   # Higher for pending (need support)
-                "granted": 0.15,  # Highest for granted (can implement)
-                "rejected": -0.05  # Small penalty but still eligible
-            }
-            score += status_bonuses.get(claim_status, 0)
+            score += STATUS_BONUSES.get(claim_status, 0)
             
             # Location-based adjustments
             if "forest" in claim_village or "jungle" in claim_village:
@@ -177,21 +415,16 @@ class RecommendationEngine:
                     score += 0.12  # Tribal schemes for tribal names
             
             # Add claim-specific variation to prevent identical recommendations
-            import random
-            claim_id = claim.get('id', 0)
-            scheme_id = scheme['id']
-            random.seed(hash(f"{claim_id}{scheme_id}{claim_area}"))  # Consistent per claim-scheme pair
-            variation = (random.random() - 0.5) * 0.08  # ±4% variation
-            score += variation
+            score += _pair_variation(claim.get('id', 0), scheme['id'], claim_area)
             
             # Ensure score is between 0 and 1
             score = max(0.0, min(1.0, score))
             
-            logger.info(f"Dynamic score {score:.3f} for scheme '{scheme['scheme_name']}' and claim {claim.get('id')}")
+            logger.info("Dynamic score %.3f for scheme '%s' and claim %s", score, scheme['scheme_name'], claim.get('id'))
             return score
         
         except Exception as e:
-            logger.error(f"Error calculating scheme score: {str(e)}")
+            logger.error("Error calculating scheme score: %s", e)
             return 0.0
     
     def _meets_basic_eligibility(self, claim: Dict[str, Any], scheme: Dict[str, Any]) -> bool:
@@ -219,42 +452,79 @@ class RecommendationEngine:
             return True
         
         except Exception as e:
-            logger.error(f"Error checking basic eligibility: {str(e)}")
+            logger.error("Error checking basic eligibility: %s", e)
             return False
     
     def get_recommendations(self, claim: Dict[str, Any], schemes: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
         """Get scheme recommendations for a claim"""
+        return self.get_recommendations_batch([claim], schemes)[0]
+    
+    def get_recommendations_batch(self, claims: List[Dict[str, Any]], schemes: Optional[List[Dict[str, Any]]] = None) -> List[List[Dict[str, Any]]]:
+        """Get scheme recommendations for many claims, scoring them all as one
+        claims x schemes matrix. Results are in the order of claims."""
+        if schemes is None:
+            schemes = self.default_schemes
+        
+        results: List[List[Dict[str, Any]]] = [[] for _ in claims]
+        scored: List[Tuple[int, _ClaimFields]] = []
+        for position, claim in enumerate(claims):
+            try:
+                scored.append((position, _ClaimFields(claim)))
+            except Exception as e:
+                logger.error("Error generating recommendations: %s", e)
+        if not scored:
+            return results
+        
         try:
-            if schemes is None:
-                schemes = self.default_schemes
-            
-            recommendations = []
+            table = self._table_for(schemes)
+            eligible, scores = table.score([fields for _, fields in scored])
+        except Exception as e:
+            logger.error("Error generating recommendations: %s", e)
+            return results
+        
+        for row, (position, fields) in enumerate(scored):
+            results[position] = self._rank_schemes(claims[position], fields, table, eligible[row], scores[row])
+        return results
+    
+    def _rank_schemes(self, claim: Dict[str, Any], fields: _ClaimFields, table: _SchemeTable,
+                      eligible: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        """Turn one claim's row of scheme scores into its top recommendations"""
+        try:
+            candidates = []
             
-            for scheme in schemes:
-                score = self.calculate_scheme_score(claim, scheme)
+            for index in np.flatnonzero(eligible).tolist():
+                scheme = table.schemes[index]
+                scheme_id = scheme['id']
                 
-                if score > 0.0:  # Only include schemes with positive scores
-                    recommendation = {
-                        "scheme_id": scheme["id"],
-                        "scheme_name": scheme["scheme_name"],
-                        "description": scheme["description"],
-                        "score": score,
-                        "eligibility_rules": scheme["eligibility_rules"]
-                    }
-                    recommendations.append(recommendation)
-            
-            # Sort by score (highest first)
-            recommendations.sort(key=lambda x: x["score"], reverse=True)
+                # Add claim-specific variation to prevent identical recommendations
+                score = float(scores[index]) + _pair_variation(fields.id, scheme_id, fields.area)
+                
+                # Ensure score is between 0 and 1
+                score = max(0.0, min(1.0, score))
+                logger.info("Dynamic score %.3f for scheme '%s' and claim %s", score, scheme['scheme_name'], claim.get('id'))
+                
+                # Filter out low-scoring recommendations (and non-positive scores)
+                if score > 0.3:
+                    candidates.append((score, scheme))
             
-            # Filter out low-scoring recommendations and limit to top 3-5
-            recommendations = [r for r in recommendations if r["score"] > 0.3]
-            recommendations = recommendations[:min(5, max(3, len(recommendations)))]
+            # Keep the top 3-5 by score (highest first, ties in scheme order)
+            # and only build response entries for those
+            recommendations = [
+                {
+                    "scheme_id": scheme["id"],
+                    "scheme_name": scheme["scheme_name"],
+                    "description": scheme["description"],
+                    "score": score,
+                    "eligibility_rules": scheme["eligibility_rules"]
+                }
+                for score, scheme in heapq.nlargest(5, candidates, key=lambda candidate: candidate[0])
+            ]
             
-            logger.info(f"Generated {len(recommendations)} recommendations for claim {claim.get('id')}")
+            logger.info("Generated %s recommendations for claim %s", len(recommendations), claim.get('id'))
             return recommendations
         
         except Exception as e:
-            logger.error(f"Error generating recommendations: {str(e)}")
+            logger.error("Error generating recommendations: %s", e)
             return []
     
     def get_scheme_details(self, scheme_id: int) -> Optional[Dict[str, Any]]:
@@ -267,8 +537,7 @@ class RecommendationEngine:
     def add_custom_scheme(self, scheme_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add a custom scheme to the engine"""
         # Generate new ID
-        max_id = max([s["id"] for s in self.default_schemes], default=0)
-        scheme_data["id"] = max_id + 1
+        scheme_data["id"] = self._next_id
         
         # Validate required fields
         required_fields = ["scheme_name", "description", "eligibility_rules"]
@@ -277,7 +546,9 @@ class RecommendationEngine:
                 raise ValueError(f"Missing required field: {field}")
         
         self.default_schemes.append(scheme_data)
-        logger.info(f"Added custom scheme: {scheme_data['scheme_name']}")
+        self._next_id += 1
+        self._default_table = None
+        logger.info("Added custom scheme: %s", scheme_data['scheme_name'])
         return scheme_data
 
 # Global recommendation engine instance